@@ -1,4 +1,6 @@
 import os
+from typing import Dict, List, Optional
+
 from dotenv import load_dotenv
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -6,31 +8,169 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app_config.env')
 load_dotenv(dotenv_path)
 
+
+class ConfigError(Exception):
+    """Некорректные или отсутствующие настройки в app_config.env"""
+
+
+# Ошибки разбора настроек собираются здесь и выбрасываются разом в validate_config(),
+# чтобы импорт конфигурации никогда не падал
+_errors: List[str] = []
+
+
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.getenv(name)
+    return value if value else default
+
+
+def _env_int(name: str, default: int, minimum: Optional[int] = None) -> int:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        _errors.append(f"{name}: ожидается целое число, получено {raw!r}")
+        return default
+    if minimum is not None and value < minimum:
+        _errors.append(f"{name}: значение должно быть не меньше {minimum}, получено {value}")
+        return default
+    return value
+
+
+def _env_float(name: str, default: float, minimum: Optional[float] = None) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        _errors.append(f"{name}: ожидается число, получено {raw!r}")
+        return default
+    if minimum is not None and value < minimum:
+        _errors.append(f"{name}: значение должно быть не меньше {minimum}, получено {value}")
+        return default
+    return value
+
+
+def _env_choice(name: str, default: str, choices: List[str]) -> str:
+    value = (os.getenv(name) or '').strip().lower()
+    if not value:
+        return default
+    if value not in choices:
+        _errors.append(f"{name}: допустимые значения {', '.join(choices)}, получено {value!r}")
+        return default
+    return value
+
+
+def _env_int_list(name: str) -> List[int]:
+    values = []
+    for item in (os.getenv(name) or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            values.append(int(item))
+        except ValueError:
+            _errors.append(f"{name}: ожидается список целых чисел через запятую, получено {item!r}")
+    return values
+
+
 # Настройки базы данных
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME'),
-    'port': int(os.getenv('DB_PORT', 3306))
+DB_CONFIG: Dict[str, object] = {
+    'host': _env_str('DB_HOST', 'localhost'),
+    'user': _env_str('DB_USER'),
+    'password': _env_str('DB_PASSWORD', ''),
+    'database': _env_str('DB_NAME'),
+    'port': _env_int('DB_PORT', 3306, minimum=1)
 }
 
 # Настройки Telegram бота
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-ADMIN_IDS = [int(id) for id in os.getenv('ADMIN_IDS', '').split(',') if id]
+BOT_TOKEN: Optional[str] = _env_str('BOT_TOKEN')
+ADMIN_IDS: List[int] = _env_int_list('ADMIN_IDS')
+# Адрес Bot API (по умолчанию api.telegram.org), например локальный telegram-bot-api сервер
+BOT_API_BASE_URL: Optional[str] = _env_str('BOT_API_BASE_URL')
+BOT_API_BASE_FILE_URL: Optional[str] = _env_str('BOT_API_BASE_FILE_URL')
+
+# Настройки webhook (если WEBHOOK_URL не задан, бот работает через polling)
+WEBHOOK_URL: Optional[str] = _env_str('WEBHOOK_URL')  # Публичный адрес, на который Telegram шлёт апдейты
+WEBHOOK_LISTEN: str = _env_str('WEBHOOK_LISTEN', '127.0.0.1')  # Адрес встроенного HTTP сервера
+WEBHOOK_PORT: int = _env_int('WEBHOOK_PORT', 8443, minimum=1)
+WEBHOOK_PATH: str = _env_str('WEBHOOK_PATH', 'webhook')
+WEBHOOK_SECRET_TOKEN: Optional[str] = _env_str('WEBHOOK_SECRET_TOKEN')  # Если не задан, генерируется при запуске
 
 # Настройки проверки
-MAX_SESSIONS_PER_USER = int(os.getenv('MAX_SESSIONS_PER_USER'))  # Максимальное количество сессий для одного пользователя
-CHECK_DELAY = float(os.getenv('CHECK_DELAY'))  # Задержка между проверками (в секундах)
-BATCH_SIZE = int(os.getenv('BATCH_SIZE'))  # Размер пакета номеров для проверки
+MAX_SESSIONS_PER_USER: int = _env_int('MAX_SESSIONS_PER_USER', 10, minimum=1)  # Максимальное количество сессий для одного пользователя
+CHECK_DELAY: float = _env_float('CHECK_DELAY', 1.0, minimum=0)  # Задержка между проверками (в секундах)
+BATCH_SIZE: int = _env_int('BATCH_SIZE', 30, minimum=1)  # Размер пакета номеров для проверки
+
+# Сводная статистика сессий и прокси
+STATS_RECONCILE_INTERVAL: int = _env_int('STATS_RECONCILE_INTERVAL', 900, minimum=0)  # Период пересчёта сводной статистики (0 - не пересчитывать)
+
+# Отправка файла с результатами
+# auto - небольшой файл отправляется как есть, крупный упаковывается в zip; gzip/zip/none - всегда указанный режим
+RESULT_COMPRESSION: str = _env_choice('RESULT_COMPRESSION', 'auto', ['auto', 'gzip', 'zip', 'none'])
+RESULT_PLAIN_MAX_BYTES: int = _env_int('RESULT_PLAIN_MAX_BYTES', 5 * 1024 * 1024, minimum=0)  # До какого размера в auto не сжимать
+# Максимальный размер одного отправляемого файла (лимит Bot API на отправку документа - 50 МБ),
+# более крупный результат делится на части
+RESULT_PART_MAX_BYTES: int = _env_int('RESULT_PART_MAX_BYTES', 45 * 1024 * 1024, minimum=1024)
+
+# Контроль нагрузки
+CONCURRENT_UPDATES: int = _env_int('CONCURRENT_UPDATES', 16, minimum=1)  # Сколько апдейтов обрабатывается одновременно
+ADMISSION_USER_RATE: float = _env_float('ADMISSION_USER_RATE', 1, minimum=0)  # Запросов в секунду от одного пользователя
+ADMISSION_USER_BURST: int = _env_int('ADMISSION_USER_BURST', 5, minimum=1)  # Допустимый всплеск запросов пользователя
+ADMISSION_GLOBAL_RATE: float = _env_float('ADMISSION_GLOBAL_RATE', 30, minimum=0)  # Запросов в секунду от всех пользователей
+ADMISSION_GLOBAL_BURST: int = _env_int('ADMISSION_GLOBAL_BURST', 60, minimum=1)
+ADMISSION_MAX_JOBS_PER_USER: int = _env_int('ADMISSION_MAX_JOBS_PER_USER', 1, minimum=1)  # Тяжёлых задач на пользователя
+ADMISSION_MAX_QUEUE_DEPTH: int = _env_int('ADMISSION_MAX_QUEUE_DEPTH', 4, minimum=1)  # Тяжёлых задач всего
+
+# Трассировка обработки апдейтов
+TRACE_SLOW_MS: int = _env_int('TRACE_SLOW_MS', 1000, minimum=0)  # С какой длительности (в мс) апдейт считается медленным
+TRACE_BUFFER_SIZE: int = _env_int('TRACE_BUFFER_SIZE', 50, minimum=1)  # Сколько медленных трасс хранить
+
+# Мониторинг event loop
+LOOP_MONITOR_INTERVAL: float = _env_float('LOOP_MONITOR_INTERVAL', 0.5, minimum=0.01)  # Период замера лага (в секундах)
+LOOP_LAG_THRESHOLD_MS: int = _env_int('LOOP_LAG_THRESHOLD_MS', 200, minimum=1)  # С какого лага снимать стек блокировки
+METRICS_HOST: str = _env_str('METRICS_HOST', '127.0.0.1')
+METRICS_PORT: int = _env_int('METRICS_PORT', 0, minimum=0)  # Порт /metrics и /healthz (0 - сервер не запускается)
 
 # Пути к файлам
-LOG_DIR = os.path.join(BASE_DIR, os.getenv('LOG_DIR'))
-STORAGE_DIR = os.path.join(BASE_DIR, os.getenv('STORAGE_DIR'))
-SESSIONS_DIR = os.path.join(STORAGE_DIR, 'sessions')
-TEMP_DIR = os.path.join(STORAGE_DIR, 'temp')
+LOG_DIR: str = os.path.join(BASE_DIR, _env_str('LOG_DIR', 'storage/logs'))
+STORAGE_DIR: str = os.path.join(BASE_DIR, _env_str('STORAGE_DIR', 'storage'))
+SESSIONS_DIR: str = os.path.join(STORAGE_DIR, 'sessions')
+TEMP_DIR: str = os.path.join(STORAGE_DIR, 'temp')
+
+# Настройки хранения состояний диалогов
+STATE_TTL: int = _env_int('STATE_TTL', 3600, minimum=1)  # Время жизни незавершённого диалога (в секундах)
+STATE_MAX_ENTRIES: int = _env_int('STATE_MAX_ENTRIES', 10000, minimum=1)  # Максимум записей в хранилище
+# SQLite файл для сохранения диалогов между перезапусками (если не задан, состояния только в памяти)
+STATE_DB_PATH: Optional[str] = os.path.join(STORAGE_DIR, _env_str('STATE_DB_FILE')) if _env_str('STATE_DB_FILE') else None
+
+# Настройки, без которых нельзя подключиться к БД
+DB_REQUIRED_SETTINGS = {
+    'DB_USER': DB_CONFIG['user'],
+    'DB_NAME': DB_CONFIG['database'],
+}
+# Настройки, без которых бот не может работать
+REQUIRED_SETTINGS = {
+    'BOT_TOKEN': BOT_TOKEN,
+    **DB_REQUIRED_SETTINGS,
+}
+
+
+def validate_config(db_only: bool = False):
+    """
+    Проверяет настройки при запуске и выбрасывает ConfigError со списком всех проблем.
+    db_only=True - проверяются только настройки БД (для init-db токен бота не нужен)
+    """
+    required = DB_REQUIRED_SETTINGS if db_only else REQUIRED_SETTINGS
+    # Сообщения в _errors начинаются с имени настройки
+    errors = [error for error in _errors if not db_only or error.startswith('DB_')]
+    errors += [f"{name}: обязательная настройка не задана" for name, value in required.items() if not value]
+    if errors:
+        raise ConfigError("Ошибки в настройках app_config.env:\n" + "\n".join(errors))
+
 
 # Создание директорий, если они не существуют
 for directory in [LOG_DIR, STORAGE_DIR, SESSIONS_DIR, TEMP_DIR]:
     os.makedirs(directory, exist_ok=True)
-
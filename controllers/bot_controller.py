@@ -1,21 +1,40 @@
+import secrets
+
 from telegram import Update
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, filters, CallbackQueryHandler
 
 from utils.state_manager import StateManager
+from utils.state_store import StateStore
 from controllers.checker_controller import CheckerController
 from controllers.message_handler_controller import MessageHandlerController
 from controllers.session_controller import SessionController
 from controllers.proxy_controller import ProxyController
+from controllers.stats_controller import StatsController
 from controllers.user_controller import UserController
+from utils.admission import AdmissionController
 from utils.logger import Logger
+from utils.loop_monitor import LoopMonitor
+from utils.metrics_server import MetricsServer
+from utils.perf_counters import PerfCounters
+from utils.tracing import Tracer
 from views.telegram_view import TelegramView
-from config.config import BOT_TOKEN
+from config.config import (
+    BOT_TOKEN, BOT_API_BASE_URL, BOT_API_BASE_FILE_URL, CONCURRENT_UPDATES,
+    WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN,
+    METRICS_HOST, METRICS_PORT
+)
 from utils.admin_checker import is_admin
 
 logger = Logger()
+tracer = Tracer()
+perf = PerfCounters()
 
 
 class BotController:
+    # Бот обрабатывает только сообщения (команды, текст, документы) и нажатия кнопок,
+    # остальные типы апдейтов Telegram присылать не должен
+    ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
     def __init__(self):
         self.state_manager = StateManager()
         self.view = TelegramView(self.state_manager)
@@ -23,9 +42,33 @@ class BotController:
         self.session_controller = SessionController(self.view, self.state_manager)
         self.proxy_controller = ProxyController(self.view, self.state_manager)
         self.user_controller = UserController(self.view)
+        self.stats_controller = StatsController()
+        self.admission = AdmissionController(self.view)
+
+        # Тяжёлые операции ограничены по числу одновременных задач
+        self._check_sessions = self.admission.limit_jobs(self.session_controller.check_sessions_command)
+        self._check_proxies = self.admission.limit_jobs(self.proxy_controller.check_proxies_command)
+
+        # Мониторинг event loop и HTTP эндпоинты /metrics и /healthz
+        self.loop_monitor = LoopMonitor()
+        self.metrics_server = MetricsServer(self.loop_monitor, METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
 
         # Создаем приложение
-        self.app = ApplicationBuilder().token(BOT_TOKEN).build()
+        builder = (
+            ApplicationBuilder()
+            .token(BOT_TOKEN)
+            .concurrent_updates(CONCURRENT_UPDATES)
+            .post_init(self._on_startup)
+            .post_shutdown(self._on_shutdown)
+        )
+        if BOT_API_BASE_URL:
+            builder = builder.base_url(BOT_API_BASE_URL)
+        if BOT_API_BASE_FILE_URL:
+            builder = builder.base_file_url(BOT_API_BASE_FILE_URL)
+        self.app = builder.build()
+
+        # Секрет для проверки, что запрос на webhook пришёл от Telegram
+        self.webhook_secret_token = WEBHOOK_SECRET_TOKEN or secrets.token_urlsafe(32)
 
         # Регистрируем обработчики
         self.message_handler_controller = MessageHandlerController(
@@ -35,20 +78,34 @@ class BotController:
         )
         self._register_handlers()
 
+    def _wrap_handler(self, handler, job=False):
+        """Пропускает обработчик через трассировку и контроль нагрузки"""
+        if job:
+            handler = self.admission.limit_jobs(handler)
+        return tracer.trace_handler(self.admission.limit_rate(handler))
+
     def _register_handlers(self):
         """Регистрирует обработчики команд и сообщений"""
         # Базовые команды
-        self.app.add_handler(CommandHandler("start", self.show_main_menu))
-        self.app.add_handler(CommandHandler("menu", self.show_main_menu))
-        self.app.add_handler(CommandHandler("help", self.help_command))
+        self.app.add_handler(CommandHandler("start", self._wrap_handler(self.show_main_menu)))
+        self.app.add_handler(CommandHandler("menu", self._wrap_handler(self.show_main_menu)))
+        self.app.add_handler(CommandHandler("help", self._wrap_handler(self.help_command)))
+        self.app.add_handler(CommandHandler("traces", self._wrap_handler(self.traces_command)))
+        self.app.add_handler(CommandHandler("perf", self._wrap_handler(self.perf_command)))
 
         # Общий обработчик для всех кнопок
-        self.app.add_handler(CallbackQueryHandler(self.handle_button_press))
+        self.app.add_handler(CallbackQueryHandler(self._wrap_handler(self.handle_button_press)))
 
         # Обработчик сообщений
-        self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.message_handler_controller.handle))
+        self.app.add_handler(MessageHandler(
+            filters.TEXT & ~filters.COMMAND,
+            self._wrap_handler(self.message_handler_controller.handle)
+        ))
         # Файл CSV
-        self.app.add_handler(MessageHandler(filters.Document.FileExtension('csv'), self.checker.start_processing_csv))
+        self.app.add_handler(MessageHandler(
+            filters.Document.FileExtension('csv'),
+            self._wrap_handler(self.checker.start_processing_csv, job=True)
+        ))
 
     async def handle_button_press(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обрабатывает нажатия на кнопки меню"""
@@ -75,6 +132,8 @@ class BotController:
             await self.help_command(update, context)
         elif callback_data == "status":
             await self.status_command(update, context)
+        elif callback_data == "perf":
+            await self.perf_command(update, context)
         elif callback_data == "add_proxy":
             await self.proxy_controller.add_proxy_command(update, context)
         elif callback_data == "update_proxy":
@@ -82,7 +141,7 @@ class BotController:
         elif callback_data == "delete_proxy":
             await self.proxy_controller.delete_proxy_command(update, context)
         elif callback_data == "check_proxies":
-            await self.proxy_controller.check_proxies_command(update, context)
+            await self._check_proxies(update, context)
         elif callback_data == "add_session":
             await self.session_controller.add_session_command(update, context)
         elif callback_data == "update_session":
@@ -90,7 +149,7 @@ class BotController:
         elif callback_data == "delete_session":
             await self.session_controller.delete_session_command(update, context)
         elif callback_data == "check_sessions":
-            await self.session_controller.check_sessions_command(update, context)
+            await self._check_sessions(update, context)
         elif callback_data == "assign_proxys_to_sessions":
             await self.session_controller.assign_proxies_to_sessions_command(update, context)
 
@@ -106,14 +165,60 @@ class BotController:
 
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обрабатывает команду /status - показывает статус сессий и прокси"""
-        # Получаем статус сессий и прокси
-        sessions_stats = await self.session_controller.get_sessions_stats()
-        proxies_stats = await self.proxy_controller.get_proxies_stats()
+        # Получаем статус сессий и прокси одним чтением сводной таблицы
+        stats = await self.stats_controller.get_status()
+        if stats['status'] == 'success':
+            sessions_status, proxies_status = stats['message']['sessions'], stats['message']['proxies']
+        else:
+            sessions_status = proxies_status = stats['message']
 
         # Отправляем статус
-        await self.view.show_status_results_menu(update, context, sessions_stats['message'], proxies_stats['message'])
+        await self.view.show_status_results_menu(update, context, sessions_status, proxies_status)
+
 
+    async def traces_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обрабатывает команду /traces - выводит последние медленные апдейты"""
+        if not await is_admin(update):
+            return
+        await self.view.show_traces(update, tracer.format_slow_traces())
+
+    async def perf_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обрабатывает команду /perf - отчёт о производительности по счётчикам в памяти, без запросов к БД"""
+        if not await is_admin(update):
+            return
+        await self.view.show_perf_report(update, perf.format_report(self.loop_monitor))
+
+    async def _on_startup(self, application):
+        """Запускает фоновый мониторинг, очистку состояний и пересчёт статистики после инициализации приложения"""
+        await self.loop_monitor.start()
+        StateStore.start_sweeper()
+        self.stats_controller.start_reconcile()
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+
+    async def _on_shutdown(self, application):
+        """Останавливает фоновые задачи при завершении работы"""
+        await self.stats_controller.stop_reconcile()
+        await StateStore.stop_sweeper()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await self.loop_monitor.stop()
+
+    def webhook_settings(self):
+        """Параметры встроенного HTTP сервера для режима webhook"""
+        return {
+            'listen': WEBHOOK_LISTEN,
+            'port': WEBHOOK_PORT,
+            'url_path': WEBHOOK_PATH,
+            'webhook_url': f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+            'secret_token': self.webhook_secret_token,
+            'allowed_updates': self.ALLOWED_UPDATES,
+        }
 
     def run(self):
-        """Запускает бота"""
-        self.app.run_polling(allowed_updates=Update.ALL_TYPES)
+        """Запускает бота в режиме webhook, если задан WEBHOOK_URL, иначе через polling"""
+        if WEBHOOK_URL:
+            logger.info(f"Starting webhook server on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+            self.app.run_webhook(**self.webhook_settings())
+        else:
+            self.app.run_polling(allowed_updates=self.ALLOWED_UPDATES)
@@ -1,13 +1,20 @@
+import os
+from functools import partial
+
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from config.config import STATE_MAX_ENTRIES
 from services.checker_service import CheckerService
 from services.session_service import SessionService
 from services.user_service import UserService
 from utils.logger import Logger
+from utils.state_store import StateStore
 
 logger = Logger()
 
+PROCESSING_CONTEXT_TTL = 24 * 60 * 60
+
 
 class CheckerController:
     def __init__(self, view):
@@ -15,19 +22,28 @@ class CheckerController:
         self.session_service = SessionService()
         self.user_service    = UserService()
         self.view            = view
-        # Для отслеживания контекста обновления
-        self.processing_context = {}
+        # Для отслеживания контекста обновления. Запись удаляется по завершении обработки,
+        # TTL страхует от утечки, если обработка оборвалась (проверка файла может идти часами)
+        self.processing_context = StateStore(ttl=PROCESSING_CONTEXT_TTL, max_size=STATE_MAX_ENTRIES)
 
     async def start_processing_csv(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Начинает обработку CSV файла"""
         user_id = update.effective_user.id
 
         # Сохраняем данные для обновления прогресса
-        self.processing_context[user_id] = {
+        self.processing_context.set(user_id, {
             'update': update,
             'context': context
-        }
+        })
+
+        try:
+            await self._process_csv(update, context, user_id)
+        finally:
+            # Очищаем контекст обработки при любом исходе
+            self.processing_context.pop(user_id, None)
 
+    async def _process_csv(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_id):
+        """Сохраняет, проверяет и отправляет обратно CSV файл пользователя"""
         # Сохраняем файл
         file_data = await self.checker_service.save_csv(update, context)
         if file_data is None:
@@ -50,16 +66,16 @@ class CheckerController:
 
         # Запускаем процесс проверки
         try:
-            # Запускаем обработку с функцией обновления прогресса
+            # Запускаем обработку с функцией обновления прогресса этого пользователя
             result = await self.checker_service.process_csv_file(
                 file_data,
                 user_in_db['message']['id'],
-                self._update_progress_menu
+                partial(self._update_progress_menu, user_id)
             )
 
             if result:
                 processed_length = len(result['results'])
-                found = sum(1 for obj in result['results'] if obj.get('has_telegram') is True)
+                found = result['results'].found_count
 
                 # Экспортируем результаты в CSV
                 result_csv = await self.checker_service.export_results_to_csv(
@@ -79,33 +95,41 @@ class CheckerController:
                     except Exception as e:
                         print(f"Ошибка при удалении старого меню: {e}")
 
-                # Отправляем файл с результатами
-                await self.view.show_final_file(
-                    update,
-                    context,
-                    result_csv
+                # Сжимаем или делим файл с результатами, если он большой
+                result_files = await self.checker_service.prepare_result_files(
+                    result_csv,
+                    bool(result['original_data'].get('header'))
                 )
+
+                # Отправляем файл с результатами
+                try:
+                    await self.view.show_final_file(
+                        update,
+                        context,
+                        result_files
+                    )
+                finally:
+                    # Сжатые файлы и части нужны только для отправки, исходный результат остаётся
+                    for path in result_files:
+                        if path != result_csv and os.path.exists(path):
+                            os.remove(path)
             else:
                 await self.view.show_start_process_menu(update, context, 0)
 
-            # Очищаем контекст обработки
-            if user_id in self.processing_context:
-                del self.processing_context[user_id]
-
         except Exception as e:
             logger.error(f"Error processing CSV: {str(e)}")
-            if user_id in self.processing_context:
-                del self.processing_context[user_id]
 
-    async def _update_progress_menu(self, total, current):
-        """Обновляет меню прогресса обработки для всех активных пользователей"""
-        for user_id, ctx in self.processing_context.items():
-            try:
-                await self.view.show_csv_checker_processing_menu(
-                    ctx['update'],
-                    ctx['context'],
-                    total,
-                    current
-                )
-            except Exception as e:
-                logger.error(f"Error updating progress menu: {str(e)}")
\ No newline at end of file
+    async def _update_progress_menu(self, user_id, total, current):
+        """Обновляет меню прогресса обработки пользователя, чей файл проверяется"""
+        ctx = self.processing_context.get(user_id)
+        if ctx is None:
+            return
+        try:
+            await self.view.show_csv_checker_processing_menu(
+                ctx['update'],
+                ctx['context'],
+                total,
+                current
+            )
+        except Exception as e:
+            logger.error(f"Error updating progress menu: {str(e)}")
\ No newline at end of file
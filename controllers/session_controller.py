@@ -1,8 +1,10 @@
 import asyncio
 from telegram import Update
 from telegram.ext import ContextTypes
+from config.config import STATE_TTL, STATE_MAX_ENTRIES
 from services.session_service import SessionService
 from utils.logger import Logger
+from utils.state_store import StateStore
 
 logger = Logger()
 
@@ -12,7 +14,8 @@ class SessionController:
         self.session_service = SessionService()
         self.view = view
         self.state_manager = state_manager
-        self._session_data = {}
+        # Данные незавершённых авторизаций; по истечении TTL ожидающие Future отменяются
+        self._session_data = StateStore(ttl=STATE_TTL, max_size=STATE_MAX_ENTRIES)
 
     async def add_session_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         await self.view.add_session_menu(update, context)
@@ -59,11 +62,11 @@ class SessionController:
         parts = message_text.split()
         phone, api_id, api_hash = parts[:3]
         if user_id not in self._session_data:
-            self._session_data[user_id] = {
+            self._session_data.set(user_id, {
                 'phone': phone,
                 'api_id': api_id,
                 'api_hash': api_hash,
-            }
+            })
         asyncio.create_task(self._start_session_flow(update, context, user_id))
         self.state_manager.set_state(user_id, "AWAITING_CODE_INPUT_FOR_SESSION")
         # Удаляем меню, которое было до этого
@@ -79,30 +82,62 @@ class SessionController:
         user_id = update.effective_user.id
         code = update.message.text.strip()
 
-        if user_id in self._session_data and "waiting_code" in self._session_data[user_id]:
-            self._session_data[user_id]["waiting_code"].set_result(code)
+        data = self._session_data.get(user_id)
+        if data is None:
+            await self._restart_session_dialog(update, user_id)
+            return
+        if "waiting_code" in data and not data["waiting_code"].done():
+            data["waiting_code"].set_result(code)
 
     async def handle_2fa_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user_id = update.effective_user.id
         password = update.message.text.strip()
 
-        if user_id in self._session_data and "waiting_password" in self._session_data[user_id]:
-            self._session_data[user_id]["waiting_password"].set_result(password)
+        data = self._session_data.get(user_id)
+        if data is None:
+            await self._restart_session_dialog(update, user_id)
+            return
+        if "waiting_password" in data and not data["waiting_password"].done():
+            data["waiting_password"].set_result(password)
+
+    async def _restart_session_dialog(self, update: Update, user_id):
+        """Данных авторизации нет (истекли или бот перезапускался) - сбрасываем диалог"""
+        self.state_manager.clear_state(user_id)
+        await self.view.show_result_message(update, {
+            'status': 'error',
+            'message': 'Авторизация сессии прервана, начните добавление сессии заново.'
+        })
 
     async def _start_session_flow(self, update, context, user_id):
-        data = self._session_data[user_id]
+        data = self._session_data.get(user_id)
+        input_expired = False
+
+        async def wait_for_input(future):
+            nonlocal input_expired
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Future отменяется хранилищем, если пользователь бросил диалог
+                if future.cancelled():
+                    # create_session перехватывает ошибку, поэтому причину запоминаем здесь
+                    input_expired = True
+                    raise TimeoutError("Время ожидания ввода истекло")
+                raise
 
         async def code_callback(phone_number=None, phone_code_hash=None):
-            future = asyncio.Future()
-            self._session_data[user_id]["waiting_code"] = future
-            return await future
+            future = asyncio.get_running_loop().create_future()
+            data["waiting_code"] = future
+            # Ожидание ввода отсчитывает TTL заново
+            self._session_data.set(user_id, data)
+            return await wait_for_input(future)
 
         async def password_callback(phone):
-            future = asyncio.Future()
-            self._session_data[user_id]["waiting_password"] = future
+            future = asyncio.get_running_loop().create_future()
+            data["waiting_password"] = future
+            self._session_data.set(user_id, data)
             self.state_manager.set_state(user_id, "AWAITING_2FA_INPUT_FOR_SESSION")
             await self.view.show_get_session_code_menu(update, phone)
-            return await future
+            return await wait_for_input(future)
 
         try:
             result = await self.session_service.add_session(
@@ -124,15 +159,16 @@ class SessionController:
             self._session_data.pop(user_id, None)
         except Exception as e:
             print(f"Ошибка при добавлении сессии: {e}")
+            # Сообщение берём до вложенного except, который переиспользует имя e
+            error_message = "Время ожидания ввода истекло" if input_expired else str(e)
             # Удаляем меню, которое было до этого
             last_menu_id = context.user_data.get("last_menu_message_id")
             if last_menu_id:
                 try:
                     await update.effective_chat.delete_message(last_menu_id)
-                except Exception as e:
-                    print(f"Ошибка при удалении старого меню: {e}")
-            await self.view.show_result_message(update, result)
-            await self.view.show_custom_menu(update,context, str(e))
+                except Exception as delete_error:
+                    print(f"Ошибка при удалении старого меню: {delete_error}")
+            await self.view.show_result_message(update, {'status': 'error', 'message': error_message})
             self.state_manager.clear_state(user_id)
             self._session_data.pop(user_id, None)
 
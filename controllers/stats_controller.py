@@ -0,0 +1,39 @@
+import asyncio
+
+from config.config import STATS_RECONCILE_INTERVAL
+from services.stats_service import StatsService
+from utils.logger import Logger
+
+logger = Logger()
+
+
+class StatsController:
+    def __init__(self):
+        self.stats_service = StatsService()
+        self._reconcile_task = None
+
+    async def get_status(self):
+        """Получить статистику по сессиям и прокси"""
+        return await self.stats_service.get_status()
+
+    def start_reconcile(self):
+        """Запускает периодический пересчёт сводной статистики (если интервал не 0)"""
+        if STATS_RECONCILE_INTERVAL and self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop_reconcile(self):
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(STATS_RECONCILE_INTERVAL)
+            try:
+                await self.stats_service.reconcile()
+            except Exception as e:
+                logger.error(f"Ошибка периодического пересчёта статистики: {e}")
@@ -1,17 +1,32 @@
+import time
+
 import mysql.connector
 from mysql.connector import pooling
 from config.config import DB_CONFIG
 from utils.logger import Logger
+from utils.perf_counters import PerfCounters
+from utils.tracing import Tracer
 
 logger = Logger()
+tracer = Tracer()
+perf = PerfCounters()
+
+# Таблицы, которые создаёт initialize_schema (модели рассчитывают на все)
+SCHEMA_TABLES = ('users', 'telegram_sessions', 'proxies', 'check_batches', 'check_results', 'stats_summary')
+
+
+class SchemaError(Exception):
+    """В базе данных нет таблиц, нужных боту"""
+
+
 class DatabaseManager:
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
-            cls._instance._create_pool()
-            cls._instance._initialize_tables()
+            # Пул создаётся при первом обращении к БД, а не при импорте моделей
+            cls._instance.pool = None
         return cls._instance
 
     def _create_pool(self):
@@ -27,8 +42,11 @@ class DatabaseManager:
             logger.error(f"Error creating connection pool: {err}")
             raise
 
-    def _initialize_tables(self):
-        """Создает необходимые таблицы в базе данных если их нет"""
+    def initialize_schema(self):
+        """
+        Создает необходимые таблицы в базе данных если их нет.
+        Не вызывается при запуске бота - выполняется отдельно командой `python main.py init-db`
+        """
         create_tables_queries = [
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -96,6 +114,17 @@ class DatabaseManager:
                 batch_id INT NOT NULL,
                 FOREIGN KEY (batch_id) REFERENCES check_batches(id) ON DELETE CASCADE
             )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS stats_summary (
+                id TINYINT PRIMARY KEY,
+                sessions_total INT NOT NULL DEFAULT 0,
+                sessions_active INT NOT NULL DEFAULT 0,
+                sessions_with_proxy INT NOT NULL DEFAULT 0,
+                proxies_total INT NOT NULL DEFAULT 0,
+                proxies_active INT NOT NULL DEFAULT 0,
+                reconciled_at TIMESTAMP NULL
+            )
             """
 
         ]
@@ -109,7 +138,7 @@ class DatabaseManager:
 
             # Затем создаем остальные таблицы
             for query in [create_tables_queries[0], create_tables_queries[1], create_tables_queries[3],
-                          create_tables_queries[4]]:
+                          create_tables_queries[4], create_tables_queries[5]]:
                 cursor.execute(query)
 
             connection.commit()
@@ -121,16 +150,46 @@ class DatabaseManager:
             cursor.close()
             connection.close()
 
+    def check_schema(self):
+        """
+        Проверяет при запуске бота, что все таблицы созданы, и выбрасывает SchemaError, если каких-то нет.
+        Иначе, например после обновления без init-db, изменения сессий и прокси откатывались бы уже в работе
+        """
+        rows = self.execute_query(
+            "SELECT table_name AS name FROM information_schema.tables WHERE table_schema = DATABASE()"
+        )
+        existing = {row['name'].lower() for row in rows}
+        missing = [table for table in SCHEMA_TABLES if table not in existing]
+        if missing:
+            raise SchemaError(
+                f"В базе данных нет таблиц: {', '.join(missing)}. Выполните `python main.py init-db`"
+            )
+
     def get_connection(self):
         """Получает соединение из пула"""
+        if self.pool is None:
+            self._create_pool()
+        started_at = time.perf_counter()
         try:
-            return self.pool.get_connection()
+            connection = self.pool.get_connection()
+            perf.record_checkout(time.perf_counter() - started_at)
+            return connection
         except mysql.connector.Error as err:
             logger.error(f"Error getting connection from pool: {err}")
             raise
 
+    @staticmethod
+    def describe_query(query):
+        """Короткое однострочное описание запроса для трассировки и метрик"""
+        return ' '.join(query.split())[:60]
+
     def execute_query(self, query, params=None, fetch=False):
         """Выполняет SQL-запрос и возвращает результат"""
+        description = self.describe_query(query)
+        with tracer.span(f"db {description}"), perf.measure_statement(description):
+            return self._execute_query(query, params, fetch)
+
+    def _execute_query(self, query, params=None, fetch=False):
         connection = self.get_connection()
         cursor = connection.cursor(dictionary=True)
         result = None
@@ -168,6 +227,11 @@ class DatabaseManager:
         if not params_list:
             return 0
 
+        description = f"batch {self.describe_query(query)}"
+        with tracer.span(f"db {description}"), perf.measure_statement(description):
+            return self._execute_batch_query(query, params_list)
+
+    def _execute_batch_query(self, query, params_list):
         connection = self.get_connection()
         cursor = connection.cursor()
         rows_affected = 0
@@ -186,12 +250,14 @@ class DatabaseManager:
             cursor.close()
             connection.close()
 
-    def execute_transaction(self, queries_with_params):
+    def execute_transaction(self, queries_with_params, label=None):
         """
         Выполняет несколько разных запросов в одной транзакции.
 
         Args:
             queries_with_params: Список кортежей (query, params)
+            label: Название транзакции для трассировки и метрик (по умолчанию - её последний запрос,
+                   первыми обычно идут служебные запросы вроде изменения stats_summary)
 
         Returns:
             Список результатов для каждого запроса
@@ -199,6 +265,11 @@ class DatabaseManager:
         if not queries_with_params:
             return []
 
+        description = f"transaction {label or self.describe_query(queries_with_params[-1][0])}"
+        with tracer.span(f"db {description}"), perf.measure_statement(description):
+            return self._execute_transaction(queries_with_params)
+
+    def _execute_transaction(self, queries_with_params):
         connection = self.get_connection()
         cursor = connection.cursor(dictionary=True)
         results = []
@@ -1,4 +1,8 @@
+import argparse
+
+from config.config import validate_config
 from controllers.bot_controller import BotController
+from dao.database import DatabaseManager
 from utils.logger import Logger
 
 logger = Logger()
@@ -10,6 +14,21 @@ class Main:
         """Запускает приложение"""
         self.bot_controller.run()
 
+    @staticmethod
+    def init_db():
+        """Создаёт таблицы в базе данных (выполняется отдельно от запуска бота)"""
+        DatabaseManager().initialize_schema()
+
 if __name__ == "__main__":
-    app = Main()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Telegram Checker Bot")
+    parser.add_argument('command', nargs='?', choices=['run', 'init-db'], default='run',
+                        help="run - запустить бота (по умолчанию), init-db - создать таблицы в БД")
+    args = parser.parse_args()
+
+    validate_config(db_only=args.command == 'init-db')
+    if args.command == 'init-db':
+        Main.init_db()
+    else:
+        DatabaseManager().check_schema()
+        app = Main()
+        app.run()
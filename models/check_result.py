@@ -0,0 +1,35 @@
+from typing import NamedTuple, Optional
+
+
+class CheckResult(NamedTuple):
+    """
+    Результат проверки одного номера.
+    Поля идут в порядке колонок check_results, поэтому запись передаётся в INSERT без преобразований
+    """
+    phone: str
+    full_name: Optional[str]
+    telegram_id: Optional[int]
+    username: Optional[str]
+    has_telegram: bool
+    user_id: int
+    batch_id: int
+
+
+class CheckResults:
+    """Результаты проверки файла со счётчиком найденных номеров, который ведётся при добавлении"""
+    __slots__ = ('records', 'found_count')
+
+    def __init__(self):
+        self.records = []
+        self.found_count = 0
+
+    def append(self, record: CheckResult):
+        self.records.append(record)
+        if record.has_telegram:
+            self.found_count += 1
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
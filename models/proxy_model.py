@@ -1,4 +1,5 @@
 from dao.database import DatabaseManager
+from models.stats_model import StatsModel
 from utils.logger import Logger
 
 logger = Logger()
@@ -17,7 +18,7 @@ class ProxyModel:
         params = (proxy_id,)
 
         try:
-            self.db.execute_query(query, params)
+            self.db.execute_transaction([StatsModel.proxy_deleted(proxy_id), (query, params)])
             logger.info(f"Proxy {proxy_id} удалён")
             return True
         except Exception as e:
@@ -70,7 +71,7 @@ class ProxyModel:
         params = (proxy_type, host, port, username, password)
 
         try:
-            proxy_id = self.db.execute_query(query, params)
+            proxy_id = self.db.execute_transaction([StatsModel.proxy_added(), (query, params)])[1]
             logger.info(f"Added new {proxy_type} proxy {host}:{port}")
             return proxy_id
         except Exception as e:
@@ -129,7 +130,7 @@ class ProxyModel:
         params = (is_active, proxy_id)
 
         try:
-            self.db.execute_query(query, params)
+            self.db.execute_transaction([StatsModel.proxies_status_changed([(is_active, proxy_id)]), (query, params)])
             status = "активен" if is_active else "неактивен"
             logger.info(f"Статус прокси {proxy_id} обновлен на {status}")
             return True
@@ -148,8 +149,11 @@ class ProxyModel:
         WHERE id = %s
         """
 
+        # Счётчик активных прокси меняется в той же транзакции, что и статусы
+        queries = [StatsModel.proxies_status_changed(proxy_statuses)]
+        queries += [(query, params) for params in proxy_statuses]
         try:
-            affected_rows = self.db.execute_batch_query(query, proxy_statuses)
+            affected_rows = sum(self.db.execute_transaction(queries)[1:])
             return affected_rows > 0
         except Exception as e:
             return False
@@ -1,5 +1,6 @@
 import os
 from dao.database import DatabaseManager
+from models.stats_model import StatsModel
 from config.config import SESSIONS_DIR
 from telethon import TelegramClient
 from telethon.sessions import StringSession
@@ -21,7 +22,7 @@ class SessionModel:
         params = (session_id,)
 
         try:
-            self.db.execute_query(query, params)
+            self.db.execute_transaction([StatsModel.session_deleted(session_id), (query, params)])
             logger.info(f"Session {session_id} deleted")
             return True
         except Exception as e:
@@ -52,8 +53,12 @@ class SessionModel:
                     WHERE id = %s
                     """
         params.append(session_id)
+
+        queries = [(query, params)]
+        if proxy_id is not None:
+            queries.insert(0, StatsModel.sessions_proxy_assigned([session_id]))
         try:
-            self.db.execute_query(query, params)
+            self.db.execute_transaction(queries)
             logger.info(f"Session {session_id} updated")
             return True
         except Exception as e:
@@ -74,7 +79,7 @@ class SessionModel:
         """
         params = (phone, api_id, api_hash, string_session)
 
-        result = self.db.execute_query(query, params)
+        result = self.db.execute_transaction([StatsModel.session_added(), (query, params)])[1]
         logger.info(f'Успех! id Добавленной сессии для телефона {phone}: {result}')
         return result
 
@@ -217,7 +222,7 @@ class SessionModel:
         params = (is_active, session_id)
 
         try:
-            self.db.execute_query(query, params)
+            self.db.execute_transaction([StatsModel.sessions_status_changed([(session_id, is_active)]), (query, params)])
             status = "активна" if is_active else "неактивна"
             logger.info(f"Session {session_id} статус обновлён на {status}")
         except Exception as e:
@@ -266,7 +271,7 @@ class SessionModel:
         query += f" WHERE id IN ({','.join(id_list)})"
 
         try:
-            self.db.execute_query(query)
+            self.db.execute_transaction([StatsModel.sessions_status_changed(session_updates), (query, None)])
             logger.info(f"Статусы {len(session_updates)} сессий успешно обновлены")
             return len(session_updates)
         except Exception as e:
@@ -275,14 +280,20 @@ class SessionModel:
 
     async def assign_proxies_to_sessions(self, params_list):
         """Назначает прокси для сессий"""
+        if not params_list:
+            return 0
+
         query = """
         UPDATE telegram_sessions
         SET proxy_id = %s
         WHERE id = %s
         """
 
+        # Счётчик сессий с прокси меняется в той же транзакции, что и назначение
+        queries = [StatsModel.sessions_proxy_assigned([session_id for _, session_id in params_list])]
+        queries += [(query, params) for params in params_list]
         try:
-            assigned_count = self.db.execute_batch_query(query, params_list)
+            assigned_count = sum(self.db.execute_transaction(queries)[1:])
             logger.info(f"Колличество прокси успешно назначен: {assigned_count}")
             return assigned_count
         except Exception as e:
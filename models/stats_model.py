@@ -0,0 +1,147 @@
+from dao.database import DatabaseManager
+from utils.logger import Logger
+
+logger = Logger()
+
+SUMMARY_COLUMNS = ('sessions_total', 'sessions_active', 'sessions_with_proxy', 'proxies_total', 'proxies_active')
+
+
+class StatsModel:
+    """
+    Сводная таблица stats_summary (одна строка с id = 1) со счётчиками сессий и прокси.
+    Методы SessionModel и ProxyModel, меняющие эти счётчики, выполняют запрос-дельту из этого класса
+    в одной транзакции со своим изменением. Дельта считается по состоянию строк до изменения,
+    поэтому она всегда идёт в транзакции первой - заодно блокировка строки сводки упорядочивает
+    одновременные изменения
+    """
+
+    def __init__(self):
+        self.db = DatabaseManager()
+
+    async def get_summary(self):
+        """Возвращает сводку одним чтением по первичному ключу"""
+        query = "SELECT * FROM stats_summary WHERE id = 1"
+        try:
+            result = self.db.execute_query(query)
+            return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Ошибка получения сводной статистики: {e}")
+            return None
+
+    async def reconcile(self):
+        """Пересчитывает сводку по таблицам и возвращает расхождения со старыми значениями"""
+        queries = [
+            ("INSERT IGNORE INTO stats_summary (id) VALUES (1)", None),
+            ("SELECT * FROM stats_summary WHERE id = 1 FOR UPDATE", None),
+            ("""
+            UPDATE stats_summary SET
+                sessions_total = (SELECT COUNT(*) FROM telegram_sessions),
+                sessions_active = (SELECT COUNT(*) FROM telegram_sessions WHERE is_active = TRUE),
+                sessions_with_proxy = (SELECT COUNT(*) FROM telegram_sessions WHERE proxy_id IS NOT NULL),
+                proxies_total = (SELECT COUNT(*) FROM proxies),
+                proxies_active = (SELECT COUNT(*) FROM proxies WHERE is_active = TRUE),
+                reconciled_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+            """, None),
+            ("SELECT * FROM stats_summary WHERE id = 1", None),
+        ]
+        try:
+            results = self.db.execute_transaction(queries, label='stats reconcile')
+            before, after = results[1][0], results[3][0]
+            drift = {
+                column: after[column] - before[column]
+                for column in SUMMARY_COLUMNS if after[column] != before[column]
+            }
+            if drift:
+                logger.warning(f"Сводная статистика расходилась с таблицами, исправлено: {drift}")
+            return drift
+        except Exception as e:
+            logger.error(f"Ошибка пересчёта сводной статистики: {e}")
+            return None
+
+    # Запросы-дельты: возвращают (query, params) для execute_transaction
+
+    @staticmethod
+    def session_added():
+        # Новая сессия активна и без прокси (значения по умолчанию telegram_sessions)
+        return ("""
+        UPDATE stats_summary
+        SET sessions_total = sessions_total + 1, sessions_active = sessions_active + 1
+        WHERE id = 1
+        """, None)
+
+    @staticmethod
+    def session_deleted(session_id):
+        return ("""
+        UPDATE stats_summary st JOIN telegram_sessions s ON s.id = %s
+        SET st.sessions_total = st.sessions_total - 1,
+            st.sessions_active = st.sessions_active - IF(s.is_active, 1, 0),
+            st.sessions_with_proxy = st.sessions_with_proxy - IF(s.proxy_id IS NULL, 0, 1)
+        WHERE st.id = 1
+        """, (session_id,))
+
+    @staticmethod
+    def sessions_status_changed(session_updates):
+        """session_updates - список кортежей (session_id, is_active)"""
+        cases = ' '.join('WHEN %s THEN %s' for _ in session_updates)
+        placeholders = ', '.join(['%s'] * len(session_updates))
+        params = [value for session_id, is_active in session_updates for value in (session_id, int(bool(is_active)))]
+        params += [session_id for session_id, _ in session_updates]
+        return (f"""
+        UPDATE stats_summary
+        SET sessions_active = sessions_active + COALESCE((
+            SELECT SUM((CASE id {cases} END) - IF(is_active, 1, 0))
+            FROM telegram_sessions
+            WHERE id IN ({placeholders})
+        ), 0)
+        WHERE id = 1
+        """, tuple(params))
+
+    @staticmethod
+    def sessions_proxy_assigned(session_ids):
+        """Сессии из session_ids получают прокси: считаются те, у которых его ещё не было"""
+        placeholders = ', '.join(['%s'] * len(session_ids))
+        return (f"""
+        UPDATE stats_summary
+        SET sessions_with_proxy = sessions_with_proxy + (
+            SELECT COUNT(*) FROM telegram_sessions WHERE proxy_id IS NULL AND id IN ({placeholders})
+        )
+        WHERE id = 1
+        """, tuple(session_ids))
+
+    @staticmethod
+    def proxy_added():
+        return ("""
+        UPDATE stats_summary
+        SET proxies_total = proxies_total + 1, proxies_active = proxies_active + 1
+        WHERE id = 1
+        """, None)
+
+    @staticmethod
+    def proxy_deleted(proxy_id):
+        # Сессии удаляемого прокси остаются без него (ON DELETE SET NULL)
+        return ("""
+        UPDATE stats_summary st JOIN proxies p ON p.id = %s
+        SET st.proxies_total = st.proxies_total - 1,
+            st.proxies_active = st.proxies_active - IF(p.is_active, 1, 0),
+            st.sessions_with_proxy = st.sessions_with_proxy
+                - (SELECT COUNT(*) FROM telegram_sessions s WHERE s.proxy_id = p.id)
+        WHERE st.id = 1
+        """, (proxy_id,))
+
+    @staticmethod
+    def proxies_status_changed(proxy_statuses):
+        """proxy_statuses - список кортежей (is_active, proxy_id), как в bulk_update_proxy_statuses"""
+        cases = ' '.join('WHEN %s THEN %s' for _ in proxy_statuses)
+        placeholders = ', '.join(['%s'] * len(proxy_statuses))
+        params = [value for is_active, proxy_id in proxy_statuses for value in (proxy_id, int(bool(is_active)))]
+        params += [proxy_id for _, proxy_id in proxy_statuses]
+        return (f"""
+        UPDATE stats_summary
+        SET proxies_active = proxies_active + COALESCE((
+            SELECT SUM((CASE id {cases} END) - IF(is_active, 1, 0))
+            FROM proxies
+            WHERE id IN ({placeholders})
+        ), 0)
+        WHERE id = 1
+        """, tuple(params))
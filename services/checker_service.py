@@ -7,7 +7,8 @@ from telethon.errors import UserPrivacyRestrictedError, FloodWaitError
 from telethon.tl.functions.contacts import ImportContactsRequest, DeleteContactsRequest
 from telethon.tl.types import InputPhoneContact, InputUser
 
-from config.config import TEMP_DIR, BATCH_SIZE
+from config.config import TEMP_DIR, BATCH_SIZE, RESULT_COMPRESSION, RESULT_PLAIN_MAX_BYTES, RESULT_PART_MAX_BYTES
+from models.check_result import CheckResult, CheckResults
 from models.checker_model import CheckerModel
 from models.session_model import SessionModel
 from services.session_service import SessionService
@@ -15,8 +16,10 @@ from utils.csv_handler import CSVHandler
 from utils.logger import Logger
 from utils.name_generator import generate_random_name
 from utils.phone_normalizer import normalize_phone_number
+from utils.tracing import Tracer
 
 logger = Logger()
+tracer = Tracer()
 
 
 class CheckerService:
@@ -34,8 +37,9 @@ class CheckerService:
 
         try:
             # Скачиваем файл
-            file_object = await context.bot.get_file(file_id)
-            file_content = await file_object.download_as_bytearray()
+            with tracer.span('csv download'):
+                file_object = await context.bot.get_file(file_id)
+                file_content = await file_object.download_as_bytearray()
 
             # Сохраняем файл во временную директорию
             temp_path = self.csv_handler.save_temp_file(file_content, file_name)
@@ -80,7 +84,7 @@ class CheckerService:
         if update_progress_callback:
             await update_progress_callback(total_numbers, processed_count)
 
-        results = []
+        results = CheckResults()
         # Ограничиваем количество параллельных запросов
         sem = asyncio.Semaphore(min(5, len(sessions)))  # Уменьшено с 10 до 5 для снижения нагрузки
 
@@ -190,11 +194,8 @@ class CheckerService:
         if update_progress_callback:
             await update_progress_callback(total_numbers, total_numbers)
 
-        await self.checker_model.bulk_save_check_result([
-            (
-            r['phone'], r['full_name'], r['telegram_id'], r['username'], r['has_telegram'], r['user_id'], r['batch_id'])
-            for r in results
-        ])
+        # Записи уже в порядке колонок check_results и передаются в INSERT без копирования
+        await self.checker_model.bulk_save_check_result(results.records)
 
         return {
             'results': results,
@@ -220,15 +221,9 @@ class CheckerService:
                     logger.error(f"Не удалось переподключиться при обработке номера {item['phone']}")
                     continue
 
-            result = {
-                'phone': item['phone'],
-                'full_name': item['full_name'],
-                'telegram_id': None,
-                'username': None,
-                'has_telegram': False,
-                'user_id': user_id,
-                'batch_id': batch_id
-            }
+            telegram_id = None
+            username = None
+            has_telegram = False
 
             name_parts = item['full_name'].split() if item['full_name'] else []
             first_name = name_parts[0] if len(name_parts) >= 1 else ''
@@ -264,9 +259,9 @@ class CheckerService:
 
                 if response and response.users:
                     user = response.users[0]
-                    result['telegram_id'] = user.id
-                    result['username'] = getattr(user, 'username', None)
-                    result['has_telegram'] = True
+                    telegram_id = user.id
+                    username = getattr(user, 'username', None)
+                    has_telegram = True
 
                     try:
                         input_user = InputUser(user_id=user.id, access_hash=user.access_hash)
@@ -303,8 +298,10 @@ class CheckerService:
                     logger.error(f"Не удалось переподключиться после ошибки соединения: {str(e)}")
                     break  # Завершаем обработку батча
 
-            results_list.append(result)
-            await self.checker_model.increment_batch_counter(batch_id, result['has_telegram'])
+            results_list.append(CheckResult(
+                item['phone'], item['full_name'], telegram_id, username, has_telegram, user_id, batch_id
+            ))
+            await self.checker_model.increment_batch_counter(batch_id, has_telegram)
 
     async def export_results_to_csv(self, batch_id, original_data):
         """Экспортирует результаты проверки в CSV файл"""
@@ -327,7 +324,7 @@ class CheckerService:
         output_path = os.path.join(TEMP_DIR, output_filename)
 
         # Записываем в CSV только строки, где номер есть в результатах
-        with open(output_path, 'w', newline='', encoding='utf-8') as outfile:
+        with tracer.span('csv export'), open(output_path, 'w', newline='', encoding='utf-8') as outfile:
             writer = csv.writer(outfile)
 
             # Записываем заголовок, если он есть
@@ -344,4 +341,37 @@ class CheckerService:
         # Обновляем запись о пакете
         await self.checker_model.update_batch_status(batch_id, 'completed', output_filename)
 
-        return output_path
\ No newline at end of file
+        return output_path
+
+    async def prepare_result_files(self, output_path, has_header=True):
+        """
+        Готовит файл с результатами к отправке и возвращает список путей.
+        Режим выбирается по размеру: небольшой файл отправляется как есть, крупный сжимается,
+        а если и сжатый файл не укладывается в RESULT_PART_MAX_BYTES - делится на части
+        """
+        # Сжатие и деление идут в потоке, чтобы не блокировать event loop на больших файлах
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._prepare_result_files, output_path, has_header)
+
+    def _prepare_result_files(self, output_path, has_header):
+        size = os.path.getsize(output_path)
+        compression = RESULT_COMPRESSION
+        if compression == 'auto':
+            compression = 'none' if size <= RESULT_PLAIN_MAX_BYTES else 'zip'
+
+        if compression == 'none':
+            if size <= RESULT_PART_MAX_BYTES:
+                return [output_path]
+            return self.csv_handler.split_file(output_path, RESULT_PART_MAX_BYTES, has_header)
+
+        compressed_path = self.csv_handler.compress_file(output_path, compression)
+        if os.path.getsize(compressed_path) <= RESULT_PART_MAX_BYTES:
+            return [compressed_path]
+
+        # Части режутся по несжатому размеру, поэтому каждая сжатая часть заведомо укладывается в лимит
+        os.remove(compressed_path)
+        files = []
+        for part_path in self.csv_handler.split_file(output_path, RESULT_PART_MAX_BYTES, has_header):
+            files.append(self.csv_handler.compress_file(part_path, compression))
+            os.remove(part_path)
+        return files
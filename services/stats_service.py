@@ -0,0 +1,43 @@
+from models.stats_model import StatsModel
+from utils.logger import Logger
+
+logger = Logger()
+
+
+class StatsService:
+    def __init__(self):
+        self.model = StatsModel()
+
+    async def get_status(self):
+        """Статистика по сессиям и прокси из сводной таблицы"""
+        summary = await self.model.get_summary()
+        if summary is None:
+            # Сводки ещё нет (например, сразу после init-db) - создаём её пересчётом
+            if await self.model.reconcile() is not None:
+                summary = await self.model.get_summary()
+        if summary is None:
+            return {'status': 'error', 'message': "Нет данных для статистики."}
+
+        sessions_total = summary['sessions_total']
+        proxies_total = summary['proxies_total']
+        return {'status': 'success', 'message': {
+            'sessions': {
+                'total': sessions_total,
+                'active': summary['sessions_active'],
+                'inactive': sessions_total - summary['sessions_active'],
+                'with proxy': summary['sessions_with_proxy'],
+                'without proxy': sessions_total - summary['sessions_with_proxy']
+            },
+            'proxies': {
+                'total': proxies_total,
+                'active': summary['proxies_active'],
+                'inactive': proxies_total - summary['proxies_active']
+            }
+        }}
+
+    async def reconcile(self):
+        """Пересчитывает сводную таблицу по исходным таблицам"""
+        drift = await self.model.reconcile()
+        if drift is not None:
+            logger.info(f"Сводная статистика пересчитана, расхождений: {len(drift)}")
+        return drift
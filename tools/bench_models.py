@@ -0,0 +1,392 @@
+"""
+Микробенчмарки слоя моделей: CheckerModel, SessionModel, ProxyModel, UserModel и StatsModel.
+
+Для каждого размера таблицы check_results (по умолчанию 1e3, 1e4, 1e5; до 1e7 по --sizes)
+таблицы наполняются синтетическими данными, каждый метод моделей вызывается --repeat раз,
+а для выполненных им запросов снимается план (EXPLAIN). Медиана времени и план сравниваются
+с сохранённой базовой линией: замедление больше допуска или смена плана считаются регрессией.
+
+Бенчмарк работает с отдельной базой MySQL (--database): база и схема создаются автоматически,
+таблицы очищаются перед наполнением. Метод SessionModel.create_session не замеряется - он ходит в Telegram.
+
+Запуск из корня проекта:
+    python -m tools.bench_models [--sizes 1000,10000,100000] [--repeat 5]
+    python -m tools.bench_models --update-baseline   # записать новую базовую линию
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'bench_models.json')
+
+SEED_CHUNK = 10000  # Строк в одном INSERT при наполнении таблиц
+USERS = 100
+SESSIONS = 200
+PROXIES = 100
+RESULTS_PER_BATCH = 1000
+
+
+def configure_environment(database):
+    """Направляет DatabaseManager на базу бенчмарка до импорта конфигурации"""
+    from dotenv import dotenv_values
+
+    production_db = dotenv_values(os.path.join(PROJECT_DIR, 'app_config.env')).get('DB_NAME')
+    if production_db and production_db == database:
+        sys.exit(f"База {database} совпадает с рабочей базой бота, укажите отдельную через --database")
+    os.environ['DB_NAME'] = database
+
+
+def create_database(database):
+    import mysql.connector
+    from config.config import DB_CONFIG
+
+    params = {key: value for key, value in DB_CONFIG.items() if key != 'database'}
+    connection = mysql.connector.connect(**params)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+        cursor.close()
+    finally:
+        connection.close()
+
+
+class QueryRecorder:
+    """Запоминает SQL запросы, выполненные через DatabaseManager во время вызова метода"""
+
+    def __init__(self, db):
+        self.db = db
+        self.queries = []
+
+    def __enter__(self):
+        db_class = type(self.db)
+
+        def execute_query(query, params=None, fetch=False):
+            self.queries.append((query, params))
+            return db_class.execute_query(self.db, query, params, fetch)
+
+        def execute_batch_query(query, params_list):
+            self.queries.append((query, params_list[0] if params_list else None))
+            return db_class.execute_batch_query(self.db, query, params_list)
+
+        def execute_transaction(queries_with_params, label=None):
+            self.queries.extend(queries_with_params)
+            return db_class.execute_transaction(self.db, queries_with_params, label)
+
+        self.db.execute_query = execute_query
+        self.db.execute_batch_query = execute_batch_query
+        self.db.execute_transaction = execute_transaction
+        return self
+
+    def __exit__(self, *exc):
+        del self.db.execute_query
+        del self.db.execute_batch_query
+        del self.db.execute_transaction
+
+
+class Seeder:
+    """Наполняет таблицы синтетическими данными, догоняя check_results до нужного размера"""
+
+    def __init__(self, db, rng):
+        self.db = db
+        self.rng = rng
+        self.results = 0
+        self.batches = 0
+        self.user_ids = []
+        self.batch_ids = []
+
+    def reset(self):
+        for table in ('check_results', 'check_batches', 'telegram_sessions', 'proxies', 'users', 'stats_summary'):
+            self.db.execute_query(f"DELETE FROM {table}")
+        self._seed_reference_data()
+
+    def _insert(self, query, rows):
+        for i in range(0, len(rows), SEED_CHUNK):
+            self.db.execute_batch_query(query, rows[i:i + SEED_CHUNK])
+
+    def _seed_reference_data(self):
+        self._insert(
+            "INSERT INTO users (telegram_id, username) VALUES (%s, %s)",
+            [(900000000 + i, f"bench_{i}") for i in range(USERS)]
+        )
+        self.user_ids = [row['id'] for row in self.db.execute_query("SELECT id FROM users")]
+        self._insert(
+            "INSERT INTO proxies (type, host, port, username, password, is_active) VALUES (%s, %s, %s, %s, %s, %s)",
+            [('socks5', f"10.0.{i // 250}.{i % 250}", 1080, 'user', 'pass', self.rng.random() < 0.8)
+             for i in range(PROXIES)]
+        )
+        proxy_ids = [row['id'] for row in self.db.execute_query("SELECT id FROM proxies")]
+        self._insert(
+            "INSERT INTO telegram_sessions (phone, api_id, api_hash, session_file, proxy_id, is_active) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(f"+7900{i:07d}", '12345', 'hash', 'session', self.rng.choice(proxy_ids) if i % 2 else None,
+              self.rng.random() < 0.8) for i in range(SESSIONS)]
+        )
+        self.results = 0
+        self.batches = 0
+
+    def grow_results(self, size):
+        """Дозаполняет check_results до size строк (и check_batches пропорционально)"""
+        while self.results < size:
+            chunk = min(SEED_CHUNK, size - self.results)
+            needed_batches = (self.results + chunk + RESULTS_PER_BATCH - 1) // RESULTS_PER_BATCH
+            if needed_batches > self.batches:
+                self._insert(
+                    "INSERT INTO check_batches (user_id, original_filename, total_numbers, status) "
+                    "VALUES (%s, %s, %s, 'completed')",
+                    [(self.rng.choice(self.user_ids), f"bench_{i}.csv", RESULTS_PER_BATCH)
+                     for i in range(self.batches, needed_batches)]
+                )
+                self.batches = needed_batches
+                self.batch_ids = [row['id'] for row in self.db.execute_query("SELECT id FROM check_batches")]
+
+            rows = []
+            for i in range(self.results, self.results + chunk):
+                has_telegram = self.rng.random() < 0.3
+                rows.append((
+                    f"+7{9000000000 + i}", f"Bench User {i}", 100000 + i if has_telegram else None,
+                    f"bench_{i}" if has_telegram else None, has_telegram,
+                    self.rng.choice(self.user_ids), self.batch_ids[i // RESULTS_PER_BATCH]
+                ))
+            self.db.execute_batch_query(
+                "INSERT INTO check_results (phone, full_name, telegram_id, username, has_telegram, user_id, batch_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                rows
+            )
+            self.results += chunk
+
+
+def build_cases(db, seeder, rng):
+    """
+    Возвращает список сценариев (имя, setup, вызов). setup готовит данные и не замеряется,
+    его результат передаётся в вызов - так разрушающие методы каждый раз работают с новой строкой
+    """
+    from models.checker_model import CheckerModel
+    from models.proxy_model import ProxyModel
+    from models.session_model import SessionModel
+    from models.stats_model import StatsModel
+    from models.user_model import UserModel
+
+    checker, sessions, proxies, users = CheckerModel(), SessionModel(), ProxyModel(), UserModel()
+    stats = StatsModel()
+    counter = iter(range(10 ** 9))
+
+    def any_user():
+        return rng.choice(seeder.user_ids)
+
+    def any_batch():
+        return rng.choice(seeder.batch_ids)
+
+    def first_id(table):
+        return db.execute_query(f"SELECT id FROM {table} ORDER BY id LIMIT 1")[0]['id']
+
+    def new_session():
+        return db.execute_query(
+            "INSERT INTO telegram_sessions (phone, api_id, api_hash, session_file) VALUES (%s, '1', 'h', 's')",
+            (f"+1555{next(counter):07d}",)
+        )
+
+    def new_proxy():
+        return db.execute_query(
+            "INSERT INTO proxies (type, host, port) VALUES ('http', %s, 8080)", (f"bench-{next(counter)}",)
+        )
+
+    def new_user():
+        telegram_id = 800000000 + next(counter)
+        db.execute_query("INSERT INTO users (telegram_id) VALUES (%s)", (telegram_id,))
+        return telegram_id
+
+    def result_rows(n=1000):
+        user_id, batch_id = any_user(), any_batch()
+        return [(f"+7{8000000000 + next(counter)}", 'Bench', None, None, False, user_id, batch_id) for _ in range(n)]
+
+    none = lambda: None
+
+    return [
+        ('CheckerModel.bulk_save_check_result[1000]', result_rows, lambda rows: checker.bulk_save_check_result(rows)),
+        ('CheckerModel.get_results_by_user_paginated', lambda: (any_user(), any_batch()),
+         lambda a: checker.get_results_by_user_paginated(*a)),
+        ('CheckerModel.create_batch', any_user, lambda user_id: checker.create_batch(user_id, 'bench.csv', 100)),
+        ('CheckerModel.update_batch_status', any_batch,
+         lambda batch_id: checker.update_batch_status(batch_id, 'completed', 'result.csv')),
+        ('CheckerModel.increment_batch_counter', any_batch,
+         lambda batch_id: checker.increment_batch_counter(batch_id, True)),
+        ('CheckerModel.get_batch_by_id', any_batch, lambda batch_id: checker.get_batch_by_id(batch_id)),
+        ('CheckerModel.get_batch_results', any_batch, lambda batch_id: checker.get_batch_results(batch_id)),
+
+        ('SessionModel.add_session_to_db', lambda: [f"+1666{next(counter):07d}", '1', 'h', 's'],
+         lambda data: sessions.add_session_to_db(data)),
+        ('SessionModel.update_session', new_session,
+         lambda session_id: sessions.update_session(session_id, api_hash='h2', proxy_id=first_id('proxies'))),
+        ('SessionModel.delete_session', new_session, lambda session_id: sessions.delete_session(session_id)),
+        ('SessionModel.get_session_by_id', lambda: first_id('telegram_sessions'),
+         lambda session_id: sessions.get_session_by_id(session_id)),
+        ('SessionModel.get_session_by_phone', none, lambda _: sessions.get_session_by_phone('+79000000001')),
+        ('SessionModel.get_available_sessions', none, lambda _: sessions.get_available_sessions(10)),
+        ('SessionModel.get_available_sessions_without_proxy', none,
+         lambda _: sessions.get_available_sessions_without_proxy(10)),
+        ('SessionModel.update_session_status', lambda: first_id('telegram_sessions'),
+         lambda session_id: sessions.update_session_status(session_id, True)),
+        ('SessionModel.update_last_used', lambda: first_id('telegram_sessions'),
+         lambda session_id: sessions.update_last_used(session_id)),
+        ('SessionModel.batch_update_sessions_status',
+         lambda: [(row['id'], True) for row in db.execute_query("SELECT id FROM telegram_sessions LIMIT 50")],
+         lambda updates: sessions.batch_update_sessions_status(updates)),
+        ('SessionModel.assign_proxies_to_sessions',
+         lambda: [(first_id('proxies'), row['id']) for row in db.execute_query("SELECT id FROM telegram_sessions LIMIT 50")],
+         lambda params: sessions.assign_proxies_to_sessions(params)),
+        ('SessionModel.get_all_sessions', none, lambda _: sessions.get_all_sessions()),
+        ('SessionModel.get_sessions_stats', none, lambda _: sessions.get_sessions_stats()),
+
+        ('ProxyModel.add_proxy', lambda: f"bench-add-{next(counter)}",
+         lambda host: proxies.add_proxy('socks5', host, 1080, 'u', 'p')),
+        ('ProxyModel.update_proxy', new_proxy, lambda proxy_id: proxies.update_proxy(proxy_id, host='10.1.1.1')),
+        ('ProxyModel.delete_proxy_by_id', new_proxy, lambda proxy_id: proxies.delete_proxy_by_id(proxy_id)),
+        ('ProxyModel.get_proxy_by_id', lambda: first_id('proxies'), lambda proxy_id: proxies.get_proxy_by_id(proxy_id)),
+        ('ProxyModel.get_all_proxies', none, lambda _: proxies.get_all_proxies()),
+        ('ProxyModel.get_available_proxies', none, lambda _: proxies.get_available_proxies(10)),
+        ('ProxyModel.update_proxy_status', lambda: first_id('proxies'),
+         lambda proxy_id: proxies.update_proxy_status(proxy_id, True)),
+        ('ProxyModel.bulk_update_proxy_statuses',
+         lambda: [(True, row['id']) for row in db.execute_query("SELECT id FROM proxies LIMIT 50")],
+         lambda statuses: proxies.bulk_update_proxy_statuses(statuses)),
+        ('ProxyModel.format_proxy_for_telethon',
+         lambda: db.execute_query("SELECT * FROM proxies ORDER BY id LIMIT 1")[0],
+         lambda proxy: proxies.format_proxy_for_telethon(proxy)),
+        ('ProxyModel.get_proxies_stats', none, lambda _: proxies.get_proxies_stats()),
+
+        ('UserModel.add_user', lambda: 700000000 + next(counter), lambda telegram_id: users.add_user(telegram_id, 'bench')),
+        ('UserModel.update_user', new_user, lambda telegram_id: users.update_user(telegram_id, 'renamed')),
+        ('UserModel.delete_user', new_user, lambda telegram_id: users.delete_user(telegram_id)),
+        ('UserModel.get_user_by_telegram_id', lambda: 900000000, lambda telegram_id: users.get_user_by_telegram_id(telegram_id)),
+        ('UserModel.get_all_users', none, lambda _: users.get_all_users()),
+
+        ('StatsModel.get_summary', none, lambda _: stats.get_summary()),
+        ('StatsModel.reconcile', none, lambda _: stats.reconcile()),
+    ]
+
+
+def explain(db, queries):
+    """Снимает планы запросов: список (таблица, тип доступа, индекс) для каждого шага"""
+    plan = []
+    db_class = type(db)
+    for query, params in queries:
+        if not query.strip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            continue
+        try:
+            rows = db_class.execute_query(db, f"EXPLAIN {query}", params, fetch=True)
+        except Exception as e:
+            plan.append(['explain failed', type(e).__name__, None])
+            continue
+        plan.extend([row.get('table'), row.get('type'), row.get('key')] for row in rows)
+    return plan
+
+
+async def call(fn, arg):
+    result = fn(arg)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def run_benchmarks(args):
+    configure_environment(args.database)
+    create_database(args.database)
+
+    from dao.database import DatabaseManager
+
+    db = DatabaseManager()
+    db.initialize_schema()
+
+    rng = random.Random(args.seed)
+    seeder = Seeder(db, rng)
+    seeder.reset()
+    cases = build_cases(db, seeder, rng)
+
+    report = {}
+    for size in args.sizes:
+        started = time.perf_counter()
+        seeder.grow_results(size)
+        print(f"\n== check_results: {size} строк (наполнение {time.perf_counter() - started:.1f} с) ==")
+
+        for name, setup, fn in cases:
+            timings = []
+            queries = []
+            for attempt in range(args.repeat):
+                arg = setup()
+                with QueryRecorder(db) as recorder:
+                    t0 = time.perf_counter()
+                    await call(fn, arg)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                if attempt == 0:
+                    queries = recorder.queries
+
+            report[f"{size}:{name}"] = {
+                'median_ms': round(statistics.median(timings), 3),
+                'plan': explain(db, queries),
+            }
+            print(f"{statistics.median(timings):10.2f} мс  {name}")
+
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Возвращает список регрессий относительно базовой линии"""
+    # Метод или размер из базовой линии, пропавший из прогона, тоже регрессия - его больше не проверяют
+    regressions = [f"{key}: есть в базовой линии, но отсутствует в прогоне" for key in baseline if key not in report]
+    for key, current in report.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key}: нет в базовой линии, запустите с --update-baseline, чтобы добавить")
+            continue
+        if current['plan'] != base['plan']:
+            regressions.append(f"{key}: план изменился {base['plan']} -> {current['plan']}")
+        limit = base['median_ms'] * (1 + tolerance)
+        if current['median_ms'] > limit:
+            regressions.append(f"{key}: {current['median_ms']:.2f} мс > {base['median_ms']:.2f} мс (+{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', default=os.getenv('BENCH_DB_NAME', 'telegram_checker_bench'))
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        type=lambda value: sorted(int(float(size)) for size in value.split(',')),
+                        help="размеры check_results через запятую, например 1e3,1e5,1e7")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--tolerance', type=float, default=0.5, help="допустимое замедление (0.5 = +50%%)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    # Без базовой линии сравнивать не с чем - это ошибка, а не успешная проверка
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        sys.exit(f"Базовая линия {args.baseline} не найдена, запишите её запуском с --update-baseline")
+
+    report = asyncio.run(run_benchmarks(args))
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, sort_keys=True)
+        print(f"\nБазовая линия записана в {args.baseline}")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(report, json.load(f), args.tolerance)
+    if regressions:
+        print("\nРегрессии:")
+        print("\n".join(regressions))
+        sys.exit(1)
+    print("\nРегрессий относительно базовой линии нет")
+
+
+if __name__ == '__main__':
+    main()
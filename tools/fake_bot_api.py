@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+from aiohttp import web
+
+
+class FakeBotApi:
+    """
+    Локальная заглушка Bot API для прогонов бота без доступа в сеть.
+    Отвечает на методы, которые использует бот, и считает количество вызовов.
+    Бот направляется на неё через BOT_API_BASE_URL=http://host:port/bot
+    """
+    BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Checker', 'username': 'checker_test_bot'}
+
+    def __init__(self, host='127.0.0.1', port=8081):
+        self.host = host
+        self.port = port
+        self.calls = Counter()
+        self._message_ids = itertools.count(1)
+        self._runner = None
+        self._updates = asyncio.Queue()
+        self._files = {}
+
+        self.app = web.Application(client_max_size=100 * 1024 * 1024)
+        self.app.router.add_post('/bot{token}/{method}', self._handle_method)
+        self.app.router.add_get('/bot{token}/{method}', self._handle_method)
+        self.app.router.add_get('/file/bot{token}/{file_path:.+}', self._handle_file_download)
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/bot"
+
+    @property
+    def base_file_url(self):
+        return f"http://{self.host}:{self.port}/file/bot"
+
+    async def start(self):
+        """Запускает HTTP сервер заглушки"""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        """Останавливает HTTP сервер заглушки"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def feed_update(self, update):
+        """Ставит апдейт в очередь, которую бот заберёт через getUpdates"""
+        self._updates.put_nowait(update)
+
+    def add_file(self, file_id, content):
+        """Регистрирует содержимое файла, доступного через getFile"""
+        self._files[file_id] = content
+
+    @property
+    def pending_updates(self):
+        return self._updates.qsize()
+
+    async def _handle_file_download(self, request):
+        file_id = request.match_info['file_path'].rsplit('/', 1)[-1]
+        content = self._files.get(file_id)
+        if content is None:
+            raise web.HTTPNotFound()
+        return web.Response(body=content)
+
+    async def _handle_method(self, request):
+        method = request.match_info['method']
+        self.calls[method] += 1
+
+        if request.content_type == 'application/json':
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+
+        handler = getattr(self, f"_api_{method}", None)
+        result = await handler(params) if handler else True
+        return web.json_response({'ok': True, 'result': result})
+
+    def _message(self, params, **extra):
+        """Формирует объект Message для ответа на отправку/редактирование"""
+        message = {
+            'message_id': int(params.get('message_id') or next(self._message_ids)),
+            'date': int(time.time()),
+            'chat': {'id': int(params.get('chat_id', 0)), 'type': 'private'},
+            'from': self.BOT_USER,
+        }
+        message.update(extra)
+        return message
+
+    async def _api_getMe(self, params):
+        return self.BOT_USER
+
+    async def _api_sendMessage(self, params):
+        return self._message(params, text=params.get('text', ''))
+
+    async def _api_editMessageText(self, params):
+        return self._message(params, text=params.get('text', ''))
+
+    async def _api_getUpdates(self, params):
+        # Long polling: ждём первый апдейт не дольше timeout, затем забираем всё, что накопилось
+        limit = int(params.get('limit') or 100)
+        timeout = float(params.get('timeout') or 0)
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self._updates.get(), timeout=max(timeout, 0.01)))
+        except asyncio.TimeoutError:
+            return updates
+        while len(updates) < limit and not self._updates.empty():
+            updates.append(self._updates.get_nowait())
+        return updates
+
+    async def _api_getFile(self, params):
+        file_id = params.get('file_id')
+        content = self._files.get(file_id, b'')
+        return {
+            'file_id': file_id,
+            'file_unique_id': file_id,
+            'file_size': len(content),
+            'file_path': f"documents/{file_id}",
+        }
+
+    async def _api_sendDocument(self, params):
+        document = params.get('document')
+        file_name = getattr(document, 'filename', None) or 'document'
+        return self._message(params, document={
+            'file_id': f"sent_{file_name}",
+            'file_unique_id': f"sent_{file_name}",
+            'file_name': file_name,
+        }, caption=params.get('caption', ''))
@@ -0,0 +1,90 @@
+"""
+Профилирует холодный старт бота: импорт main и создание Main() в отдельном процессе.
+
+БД направляется на заведомо недоступный адрес - если при старте кто-то попытается
+подключиться к MySQL или создать таблицы, старт упадёт или выйдет за бюджет.
+Скрипт завершается с кодом 1, если холодный старт превысил бюджет.
+
+Запуск из корня проекта:
+    python -m tools.import_profile [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Импорт и сборка приложения, время сборки выводится отдельной строкой
+STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+import main
+main.Main()
+print(f"STARTUP_MS={(time.perf_counter() - started) * 1000:.1f}")
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_startup():
+    """Запускает холодный старт в подпроцессе с -X importtime"""
+    env = dict(os.environ)
+    env.update({
+        'BOT_TOKEN': env.get('BOT_TOKEN') or '123456:PROFILE',
+        # 192.0.2.0/24 зарезервирована для документации и не маршрутизируется
+        'DB_HOST': '192.0.2.1',
+        'DB_USER': 'profile',
+        'DB_NAME': 'profile',
+        'METRICS_PORT': '0',
+    })
+    return subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def parse_importtime(stderr):
+    """Возвращает список (модуль, собственное время мкс, накопленное время мкс, вложенность)"""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    result = run_startup()
+    match = re.search(r"STARTUP_MS=([\d.]+)", result.stdout)
+    if result.returncode != 0 or not match:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        print("Холодный старт завершился ошибкой:")
+        print("\n".join(errors[-20:]))
+        sys.exit(1)
+
+    startup_ms = float(match.group(1))
+    modules = parse_importtime(result.stderr)
+    top_level = [m for m in modules if m[3] == 0]
+    import_ms = sum(m[2] for m in top_level) / 1000
+
+    print(f"Импорт модулей: {import_ms:.1f} мс, холодный старт (импорт + Main()): {startup_ms:.1f} мс")
+    print(f"Самые медленные импорты верхнего уровня:")
+    for name, _, cumulative_us, _ in sorted(top_level, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} мс  {name}")
+
+    if startup_ms > args.budget_ms:
+        print(f"Бюджет холодного старта превышен: {startup_ms:.1f} мс > {args.budget_ms:.0f} мс")
+        sys.exit(1)
+    print(f"Бюджет соблюдён: {startup_ms:.1f} мс <= {args.budget_ms:.0f} мс")
+
+
+if __name__ == '__main__':
+    main()
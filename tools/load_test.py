@@ -0,0 +1,201 @@
+"""
+Нагрузочный прогон бота целиком против локальной заглушки Bot API.
+
+Бот запускается в режиме polling и забирает синтетический трафик из заглушки через getUpdates:
+навигацию по меню, запросы статуса и загрузку CSV. По итогам выводятся пропускная способность
+(апдейтов в секунду), p50/p99 длительности обработчиков и потребление памяти.
+
+Бэкенд БД - локальный MySQL из настроек DB_* (лучше отдельная база, таблицы создаются
+через init-db). SQLite не поддерживается: модели написаны на диалекте MySQL.
+Проверка номеров через Telegram (Telethon) в прогоне не участвует - загрузка CSV
+проходит скачивание, сохранение, разбор и создание батча, после чего упирается в отсутствие сессий.
+
+Запуск из корня проекта:
+    python -m tools.load_test [--updates 2000] [--users 50] [--rate 0] [--csv-rows 200]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from tools.fake_bot_api import FakeBotApi
+
+# Доли типов трафика: навигация по меню, статус, загрузка CSV
+TRAFFIC_MIX = (('navigation', 0.7), ('status', 0.2), ('csv', 0.1))
+NAVIGATION_CALLBACKS = ('main_menu', 'help', 'proxy_menu', 'session_menu')
+FIRST_USER_ID = 700000000
+
+
+class TrafficGenerator:
+    """Генерирует синтетические апдейты от набора пользователей"""
+
+    def __init__(self, api, users, csv_rows, seed=1):
+        self.api = api
+        self.users = [FIRST_USER_ID + i for i in range(users)]
+        self.csv_rows = csv_rows
+        self.random = random.Random(seed)
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._files = itertools.count(1)
+
+    def _user(self, user_id):
+        return {'id': user_id, 'is_bot': False, 'first_name': 'Load', 'username': f"load_{user_id}"}
+
+    def _message(self, user_id, **extra):
+        message = {
+            'message_id': next(self._message_ids),
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': self._user(user_id),
+        }
+        message.update(extra)
+        return message
+
+    def command(self, user_id, command):
+        return {
+            'update_id': next(self._update_ids),
+            'message': self._message(
+                user_id, text=command, entities=[{'type': 'bot_command', 'offset': 0, 'length': len(command)}]
+            ),
+        }
+
+    def callback(self, user_id, data):
+        return {
+            'update_id': next(self._update_ids),
+            'callback_query': {
+                'id': str(next(self._update_ids)),
+                'chat_instance': str(user_id),
+                'data': data,
+                'from': self._user(user_id),
+                'message': self._message(user_id, text='menu'),
+            },
+        }
+
+    def csv_upload(self, user_id):
+        file_id = f"load_{next(self._files)}.csv"
+        rows = [f"7{self.random.randint(900000000, 999999999)},Load User {i}" for i in range(self.csv_rows)]
+        self.api.add_file(file_id, ("phone,name\n" + "\n".join(rows) + "\n").encode('utf-8'))
+        return {
+            'update_id': next(self._update_ids),
+            'message': self._message(user_id, document={
+                'file_id': file_id,
+                'file_unique_id': file_id,
+                'file_name': file_id,
+                'mime_type': 'text/csv',
+            }),
+        }
+
+    def next_update(self):
+        user_id = self.random.choice(self.users)
+        kind = self.random.choices([k for k, _ in TRAFFIC_MIX], weights=[w for _, w in TRAFFIC_MIX])[0]
+        if kind == 'csv':
+            return self.csv_upload(user_id)
+        if kind == 'status':
+            return self.callback(user_id, 'status')
+        if self.random.random() < 0.2:
+            return self.command(user_id, '/start')
+        return self.callback(user_id, self.random.choice(NAVIGATION_CALLBACKS))
+
+
+def configure_environment(api, users, keep_admission_limits):
+    """Направляет бота на заглушку Bot API до импорта конфигурации"""
+    os.environ.setdefault('BOT_TOKEN', '123456:LOAD')
+    os.environ['BOT_API_BASE_URL'] = api.base_url
+    os.environ['BOT_API_BASE_FILE_URL'] = api.base_file_url
+    os.environ['WEBHOOK_URL'] = ''
+    os.environ['METRICS_PORT'] = '0'
+    # Синтетические пользователи - админы, чтобы открывались все меню и статус
+    os.environ['ADMIN_IDS'] = ','.join(str(FIRST_USER_ID + i) for i in range(users))
+    if not keep_admission_limits:
+        for name in ('ADMISSION_USER_RATE', 'ADMISSION_USER_BURST', 'ADMISSION_GLOBAL_RATE',
+                     'ADMISSION_GLOBAL_BURST', 'ADMISSION_MAX_JOBS_PER_USER', 'ADMISSION_MAX_QUEUE_DEPTH'):
+            os.environ[name] = '1000000'
+
+
+def rss_mb():
+    """Пиковый RSS процесса в МБ (ru_maxrss в Linux - в КБ)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_load(args):
+    api = FakeBotApi(port=args.api_port)
+    configure_environment(api, args.users, args.keep_admission_limits)
+
+    from controllers.bot_controller import BotController
+    from utils.metrics import RollingWindow
+    from utils.tracing import Tracer
+
+    tracer = Tracer()
+    # Хранить все замеры прогона, а не только последние
+    tracer.handler_latency = RollingWindow(size=args.updates)
+
+    generator = TrafficGenerator(api, args.users, args.csv_rows)
+    updates = [generator.next_update() for _ in range(args.updates)]
+
+    await api.start()
+    bot = BotController()
+    rss_before = rss_mb()
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    try:
+        async with bot.app:
+            await bot.app.updater.start_polling(allowed_updates=bot.ALLOWED_UPDATES, poll_interval=0, timeout=1)
+            await bot.app.start()
+
+            started = time.perf_counter()
+            for update in updates:
+                api.feed_update(update)
+                if args.rate:
+                    await asyncio.sleep(1 / args.rate)
+
+            deadline = started + args.timeout
+            while tracer.handler_latency.count < len(updates) and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            elapsed = time.perf_counter() - started
+
+            await bot.app.updater.stop()
+            await bot.app.stop()
+    finally:
+        await api.stop()
+
+    processed = tracer.handler_latency.count
+    latency = tracer.handler_latency
+    print(f"Апдейтов отправлено: {len(updates)}, обработано: {processed} за {elapsed:.2f} с")
+    print(f"Пропускная способность: {processed / elapsed:.1f} апдейтов/с")
+    print(f"Длительность обработчика: p50 {(latency.percentile(50) or 0) * 1000:.1f} мс, "
+          f"p99 {(latency.percentile(99) or 0) * 1000:.1f} мс, max {(latency.max() or 0) * 1000:.1f} мс")
+    print(f"Пиковый RSS: {rss_mb():.1f} МБ (до прогона {rss_before:.1f} МБ)")
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"tracemalloc: текущая {current / 1024 / 1024:.1f} МБ, пик {peak / 1024 / 1024:.1f} МБ")
+    print(f"Вызовы Bot API: {dict(api.calls)}")
+
+    return processed == len(updates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--updates', type=int, default=2000, help="сколько апдейтов отправить")
+    parser.add_argument('--users', type=int, default=50, help="сколько синтетических пользователей")
+    parser.add_argument('--rate', type=float, default=0, help="апдейтов в секунду (0 - без ограничения)")
+    parser.add_argument('--csv-rows', type=int, default=200, help="строк в загружаемых CSV")
+    parser.add_argument('--timeout', type=float, default=300, help="сколько ждать обработки (в секундах)")
+    parser.add_argument('--api-port', type=int, default=8082)
+    parser.add_argument('--keep-admission-limits', action='store_true',
+                        help="не снимать лимиты контроля нагрузки из app_config.env")
+    parser.add_argument('--tracemalloc', action='store_true', help="дополнительно считать память через tracemalloc")
+    args = parser.parse_args()
+
+    ok = asyncio.run(run_load(args))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
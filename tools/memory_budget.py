@@ -0,0 +1,176 @@
+"""
+Бюджет памяти конвейера загрузки CSV: save_csv -> read_csv_file -> extract_phone_name -> export_results_to_csv.
+
+Конвейер прогоняется на синтетических файлах возрастающего размера. Для каждой стадии выводятся
+пик памяти (tracemalloc) во время стадии, память, которую стадия оставляет живой, и RSS процесса.
+Скрипт завершается с кодом 1, если пик памяти на строку файла превысил бюджет.
+
+Сеть и БД не используются: скачивание файла подменяется заглушками update/context,
+а модель проверок - заглушкой, которая отдаёт результаты для каждого третьего номера.
+
+Запуск из корня проекта:
+    python -m tools.memory_budget [--sizes 1000,10000,100000] [--budget-bytes-per-row 1024]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import resource
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+FOUND_EVERY = 3  # Каждый какой номер заглушка считает найденным в Telegram
+
+
+class StubCheckerModel:
+    """Заглушка CheckerModel с методами, которые вызывает export_results_to_csv"""
+
+    def __init__(self, batch_id, filename, results):
+        self.batch = {'id': batch_id, 'original_filename': filename}
+        self.results = results
+
+    async def get_batch_by_id(self, batch_id):
+        return self.batch
+
+    async def get_batch_results(self, batch_id):
+        return self.results
+
+    async def update_batch_status(self, batch_id, status, result_filename=None):
+        return True
+
+
+def fake_upload(filename, content):
+    """Заглушки update и context для save_csv: файл "скачивается" из памяти"""
+
+    async def download_as_bytearray():
+        return bytearray(content)
+
+    async def get_file(file_id):
+        return SimpleNamespace(download_as_bytearray=download_as_bytearray)
+
+    update = SimpleNamespace(message=SimpleNamespace(document=SimpleNamespace(file_id=filename, file_name=filename)))
+    context = SimpleNamespace(bot=SimpleNamespace(get_file=get_file))
+    return update, context
+
+
+def synthetic_csv(rows, seed=1):
+    rng = random.Random(seed)
+    lines = ["phone,name,comment"]
+    lines += [f"7{rng.randint(900000000, 999999999)},Иван Петров {i},комментарий {i}" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def rss_mb():
+    """Текущий RSS процесса в МБ (из /proc, иначе пиковый ru_maxrss)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StageMeter:
+    """Замеряет пик и удерживаемую память по стадиям конвейера"""
+
+    def __init__(self):
+        self.stages = []
+        self.baseline = 0
+
+    def start(self):
+        gc.collect()
+        tracemalloc.start()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+
+    def stage(self, name):
+        meter = self
+
+        class _Stage:
+            def __enter__(self):
+                tracemalloc.reset_peak()
+
+            def __exit__(self, *exc):
+                current, peak = tracemalloc.get_traced_memory()
+                meter.stages.append((name, peak - meter.baseline, current - meter.baseline, rss_mb()))
+
+        return _Stage()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    @property
+    def peak(self):
+        return max(stage[1] for stage in self.stages)
+
+
+async def run_pipeline(service, rows):
+    filename = f"memory_budget_{rows}.csv"
+    content = synthetic_csv(rows)
+    update, context = fake_upload(filename, content)
+    meter = StageMeter()
+    meter.start()
+    output_path = None
+    file_data = None
+
+    try:
+        with meter.stage('save_csv'):
+            file_data = await service.save_csv(update, context)
+        del content, update, context
+
+        with meter.stage('read_csv_file'):
+            csv_data = service.csv_handler.read_csv_file(file_data[0])
+
+        with meter.stage('extract_phone_name'):
+            phone_data = service.csv_handler.extract_phone_name(csv_data)
+
+        # Результаты проверки (как их вернула бы get_batch_results) - вне стадий конвейера
+        results = [{'phone': item['phone'], 'has_telegram': True} for item in phone_data[::FOUND_EVERY]]
+        service.checker_model = StubCheckerModel(rows, filename, results)
+
+        with meter.stage('export_results_to_csv'):
+            output_path = await service.export_results_to_csv(rows, csv_data)
+    finally:
+        meter.stop()
+        for path in (file_data[0] if file_data else None, output_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    return meter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        type=lambda value: sorted(int(float(size)) for size in value.split(',')),
+                        help="количество строк в синтетических файлах через запятую")
+    parser.add_argument('--budget-bytes-per-row', type=float, default=1024,
+                        help="допустимый пик памяти конвейера на одну строку файла")
+    args = parser.parse_args()
+
+    from services.checker_service import CheckerService
+
+    service = CheckerService()
+    # Прогрев: ленивые импорты и таблицы chardet не должны попадать в замер первого размера
+    asyncio.run(run_pipeline(service, 100))
+    over_budget = []
+
+    for rows in args.sizes:
+        meter = asyncio.run(run_pipeline(service, rows))
+        per_row = meter.peak / rows
+        print(f"\n== {rows} строк: пик {meter.peak / 1024 / 1024:.1f} МБ, {per_row:.0f} байт/строку ==")
+        print(f"  {'стадия':<24}{'пик, МБ':>10}{'удержано, МБ':>15}{'RSS, МБ':>10}")
+        for name, peak, retained, rss in meter.stages:
+            print(f"  {name:<24}{peak / 1024 / 1024:>10.1f}{retained / 1024 / 1024:>15.1f}{rss:>10.1f}")
+        if per_row > args.budget_bytes_per_row:
+            over_budget.append(f"{rows} строк: {per_row:.0f} байт/строку > {args.budget_bytes_per_row:.0f}")
+
+    if over_budget:
+        print("\nБюджет памяти превышен:")
+        print("\n".join(over_budget))
+        sys.exit(1)
+    print(f"\nБюджет памяти соблюдён: не больше {args.budget_bytes_per_row:.0f} байт на строку")
+
+
+if __name__ == '__main__':
+    main()
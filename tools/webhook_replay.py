@@ -0,0 +1,106 @@
+"""
+Прогоняет записанные апдейты через webhook-эндпоинт бота без доступа в сеть.
+
+Бот поднимается в режиме webhook и направляется на локальную заглушку Bot API,
+после чего апдейты из .jsonl файла отправляются POST-запросами на встроенный
+HTTP сервер бота. Дополнительно проверяется, что запрос с неверным секретом отклоняется.
+
+Запуск из корня проекта:
+    python -m tools.webhook_replay [tools/fixtures/recorded_updates.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import aiohttp
+
+from tools.fake_bot_api import FakeBotApi
+
+DEFAULT_UPDATES_FILE = os.path.join(os.path.dirname(__file__), 'fixtures', 'recorded_updates.jsonl')
+SECRET_TOKEN = 'replay-secret-token'
+
+
+def load_updates(path):
+    """Читает апдейты из .jsonl файла (по одному JSON объекту на строку)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def configure_environment(api, webhook_port):
+    """Направляет бота на заглушку Bot API до импорта конфигурации"""
+    os.environ.setdefault('BOT_TOKEN', '123456:REPLAY')
+    os.environ['BOT_API_BASE_URL'] = api.base_url
+    os.environ['BOT_API_BASE_FILE_URL'] = api.base_file_url
+    os.environ['WEBHOOK_URL'] = f"http://127.0.0.1:{webhook_port}"
+    os.environ['WEBHOOK_LISTEN'] = '127.0.0.1'
+    os.environ['WEBHOOK_PORT'] = str(webhook_port)
+    os.environ['WEBHOOK_SECRET_TOKEN'] = SECRET_TOKEN
+
+
+async def replay(updates, api_port, webhook_port):
+    api = FakeBotApi(port=api_port)
+    configure_environment(api, webhook_port)
+
+    from controllers.bot_controller import BotController
+
+    await api.start()
+    bot = BotController()
+    settings = bot.webhook_settings()
+    endpoint = f"http://127.0.0.1:{webhook_port}/{settings['url_path']}"
+    statuses = []
+
+    try:
+        async with bot.app:
+            await bot.app.updater.start_webhook(**settings)
+            await bot.app.start()
+
+            async with aiohttp.ClientSession() as session:
+                for update in updates:
+                    async with session.post(
+                        endpoint,
+                        json=update,
+                        headers={'X-Telegram-Bot-Api-Secret-Token': SECRET_TOKEN}
+                    ) as response:
+                        statuses.append(response.status)
+
+                # Запрос без правильного секрета должен быть отклонён
+                async with session.post(
+                    endpoint,
+                    json=updates[0],
+                    headers={'X-Telegram-Bot-Api-Secret-Token': 'wrong-secret'}
+                ) as response:
+                    forged_status = response.status
+
+            # Ждём, пока приложение разберёт очередь апдейтов
+            while not bot.app.update_queue.empty():
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.5)
+
+            await bot.app.updater.stop()
+            await bot.app.stop()
+    finally:
+        await api.stop()
+
+    accepted = sum(1 for status in statuses if status == 200)
+    print(f"Отправлено апдейтов: {len(updates)}, принято: {accepted}")
+    print(f"Запрос с неверным секретом: HTTP {forged_status}")
+    print(f"Вызовы Bot API: {dict(api.calls)}")
+
+    return accepted == len(updates) and forged_status == 403
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('updates_file', nargs='?', default=DEFAULT_UPDATES_FILE)
+    parser.add_argument('--api-port', type=int, default=8081)
+    parser.add_argument('--webhook-port', type=int, default=8444)
+    args = parser.parse_args()
+
+    ok = asyncio.run(replay(load_updates(args.updates_file), args.api_port, args.webhook_port))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
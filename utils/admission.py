@@ -0,0 +1,119 @@
+import time
+from functools import wraps
+
+from config.config import (
+    ADMISSION_USER_RATE, ADMISSION_USER_BURST, ADMISSION_GLOBAL_RATE, ADMISSION_GLOBAL_BURST,
+    ADMISSION_MAX_JOBS_PER_USER, ADMISSION_MAX_QUEUE_DEPTH, STATE_MAX_ENTRIES
+)
+from utils.logger import Logger
+from utils.state_store import StateStore
+
+logger = Logger()
+
+# Через сколько секунд бездействия бакет пользователя выбрасывается (он к этому времени уже полон)
+USER_BUCKET_TTL = 600
+
+
+class TokenBucket:
+    """Token bucket: пополняется на rate токенов в секунду, но не больше capacity"""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_consume(self, amount: float = 1) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def refund(self, amount: float = 1) -> None:
+        """Возвращает токены, если запрос всё-таки не был допущен"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdmissionController:
+    """
+    Контроль допуска апдейтов к обработчикам бота.
+    Частота запросов ограничивается token bucket'ами на пользователя и общим,
+    тяжёлые задачи - числом одновременных задач на пользователя и общей глубиной очереди.
+    При превышении лимита пользователь сразу получает отказ, задача не запускается.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.global_bucket = TokenBucket(ADMISSION_GLOBAL_RATE, ADMISSION_GLOBAL_BURST)
+        self._user_buckets = StateStore(ttl=USER_BUCKET_TTL, max_size=STATE_MAX_ENTRIES)
+        self._user_jobs = {}
+        self._active_jobs = 0
+
+    @property
+    def active_jobs(self) -> int:
+        return self._active_jobs
+
+    def check_rate(self, user_id):
+        """Возвращает причину отказа или None, если лимит частоты не превышен"""
+        bucket = self._user_buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(ADMISSION_USER_RATE, ADMISSION_USER_BURST)
+        # Перезаписываем, чтобы продлить TTL активного пользователя
+        self._user_buckets.set(user_id, bucket)
+
+        if not bucket.try_consume():
+            return "Слишком много запросов, подождите немного"
+        if not self.global_bucket.try_consume():
+            # Отказ не по вине пользователя - его токен не сгорает
+            bucket.refund()
+            return "Бот перегружен, попробуйте позже"
+        return None
+
+    def check_jobs(self, user_id):
+        """Возвращает причину отказа или None, если можно запустить ещё одну тяжёлую задачу"""
+        if self._user_jobs.get(user_id, 0) >= ADMISSION_MAX_JOBS_PER_USER:
+            return "У вас уже выполняется задача, дождитесь её завершения"
+        if self._active_jobs >= ADMISSION_MAX_QUEUE_DEPTH:
+            return "Бот перегружен, попробуйте позже"
+        return None
+
+    def limit_rate(self, handler):
+        """Оборачивает обработчик ограничением частоты запросов"""
+        @wraps(handler)
+        async def wrapper(update, context):
+            user_id = update.effective_user.id if update.effective_user else None
+            reason = self.check_rate(user_id)
+            if reason is not None:
+                logger.warning(f"Update from {user_id} rejected by rate limit: {reason}")
+                await self.view.show_rejected_message(update, reason)
+                return
+            return await handler(update, context)
+
+        return wrapper
+
+    def limit_jobs(self, handler):
+        """Оборачивает тяжёлый обработчик ограничением числа одновременных задач"""
+        @wraps(handler)
+        async def wrapper(update, context):
+            user_id = update.effective_user.id if update.effective_user else None
+            reason = self.check_jobs(user_id)
+            if reason is not None:
+                logger.warning(f"Job from {user_id} rejected: {reason}")
+                await self.view.show_rejected_message(update, reason)
+                return
+
+            self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+            self._active_jobs += 1
+            try:
+                return await handler(update, context)
+            finally:
+                self._active_jobs -= 1
+                self._user_jobs[user_id] -= 1
+                if not self._user_jobs[user_id]:
+                    del self._user_jobs[user_id]
+
+        return wrapper
@@ -1,17 +1,24 @@
 import csv
+import gzip
+import io
 import os
+import shutil
+import zipfile
 import chardet
 import codecs
 
 from config.config import TEMP_DIR
 from utils.logger import Logger
 from utils.phone_normalizer import normalize_phone_number
+from utils.tracing import Tracer
 
 logger = Logger()
+tracer = Tracer()
 
 
 class CSVHandler:
     @staticmethod
+    @tracer.traced('csv save')
     def save_temp_file(file_content, filename):
         """Сохраняет временный CSV файл"""
         file_path = os.path.join(TEMP_DIR, filename)
@@ -26,6 +33,7 @@ class CSVHandler:
             raise
 
     @staticmethod
+    @tracer.traced('csv read')
     def read_csv_file(file_path):
         """Читает CSV файл и возвращает данные с автоопределением кодировки"""
         try:
@@ -113,6 +121,7 @@ class CSVHandler:
             raise
 
     @staticmethod
+    @tracer.traced('csv extract')
     def extract_phone_name(csv_data):
         """Извлекает номера телефонов и ФИО из данных CSV"""
         result = []
@@ -149,6 +158,7 @@ class CSVHandler:
         return result
 
     @staticmethod
+    @tracer.traced('csv create result')
     def create_result_csv(output_path, results, original_data):
         """Создает CSV файл с результатами проверки"""
         try:
@@ -176,4 +186,72 @@ class CSVHandler:
             return output_path
         except Exception as e:
             logger.error(f"Error creating result CSV file: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    @tracer.traced('csv compress')
+    def compress_file(file_path, compression):
+        """Сжимает файл в gzip или zip потоково, не читая его в память целиком"""
+        if compression == 'gzip':
+            output_path = f"{file_path}.gz"
+            with open(file_path, 'rb') as src, gzip.open(output_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        elif compression == 'zip':
+            output_path = f"{os.path.splitext(file_path)[0]}.zip"
+            with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.write(file_path, arcname=os.path.basename(file_path))
+        else:
+            raise ValueError(f"Unknown compression: {compression}")
+
+        logger.info(f"Compressed {file_path} ({compression}): {os.path.getsize(file_path)} -> {os.path.getsize(output_path)} bytes")
+        return output_path
+
+    @staticmethod
+    @tracer.traced('csv split')
+    def split_file(file_path, max_bytes, has_header=True):
+        """
+        Делит CSV файл на части не больше max_bytes байт по границам строк.
+        Заголовок повторяется в каждой части, строки читаются и пишутся потоково
+        """
+        base, ext = os.path.splitext(file_path)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def encode(row):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            return buffer.getvalue().encode('utf-8')
+
+        parts = []
+        part = None
+        part_size = 0
+        header = None
+
+        try:
+            with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                if has_header:
+                    first = next(reader, None)
+                    header = encode(first) if first is not None else None
+
+                for row in reader:
+                    line = encode(row)
+                    if part is None or part_size + len(line) > max_bytes:
+                        if part is not None:
+                            part.close()
+                        part_path = f"{base}_part{len(parts) + 1}{ext}"
+                        parts.append(part_path)
+                        part = open(part_path, 'wb')
+                        part_size = 0
+                        if header:
+                            part.write(header)
+                            part_size += len(header)
+                    part.write(line)
+                    part_size += len(line)
+        finally:
+            if part is not None:
+                part.close()
+
+        logger.info(f"Split {file_path} into {len(parts)} parts of at most {max_bytes} bytes")
+        return parts
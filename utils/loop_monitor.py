@@ -0,0 +1,91 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from config.config import LOOP_MONITOR_INTERVAL, LOOP_LAG_THRESHOLD_MS
+from utils.logger import Logger
+from utils.metrics import RollingWindow
+
+logger = Logger()
+
+
+class LoopMonitor:
+    """
+    Сторож event loop.
+    Корутина в цикле засыпает на interval и замеряет, насколько позже она проснулась - это лаг loop.
+    Отдельный поток следит за «пульсом» этой корутины: если loop не отвечает дольше порога,
+    поток снимает стек потока loop, то есть стек вызова, который его блокирует.
+    """
+
+    def __init__(self, interval=LOOP_MONITOR_INTERVAL, threshold_ms=LOOP_LAG_THRESHOLD_MS):
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.lag = RollingWindow()
+        self.last_lag = 0.0  # Лаг в последнем замере (в секундах)
+        self.blocked_count = 0
+        # Последние снятые стеки блокирующих вызовов: (время, длительность блокировки, стек)
+        self.blocking_stacks = deque(maxlen=20)
+
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    def is_healthy(self):
+        """Loop считается здоровым, если последний замер лага ниже порога"""
+        return self.last_lag < self.threshold
+
+    async def start(self):
+        """Запускает замер лага и поток-сторож. Вызывается из работающего loop"""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._measure_lag())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        logger.info(f"Event loop monitor started, lag threshold {self.threshold * 1000:.0f}ms")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _measure_lag(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - started - self.interval)
+            self.last_lag = lag
+            self.lag.add(lag)
+            if lag >= self.threshold:
+                logger.warning(f"Event loop lag {lag * 1000:.0f}ms")
+
+    def _watch(self):
+        """Поток-сторож: снимает стек loop один раз за каждую блокировку"""
+        reported = False
+        while not self._stopped.wait(self.threshold / 2):
+            stalled_for = time.monotonic() - self._heartbeat - self.interval
+            if stalled_for < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+
+            reported = True
+            self.blocked_count += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            self.blocking_stacks.append((time.time(), stalled_for, stack))
+            logger.warning(f"Event loop blocked for more than {stalled_for * 1000:.0f}ms, current stack:\n{stack}")
@@ -0,0 +1,34 @@
+import math
+from collections import deque
+
+
+def percentile(values, q):
+    """Возвращает перцентиль q (0..100) по методу ближайшего ранга или None для пустой выборки"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RollingWindow:
+    """Хранит последние size замеров и общий счётчик для расчёта перцентилей"""
+
+    def __init__(self, size=1000):
+        self._values = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self._values.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        return percentile(self._values, q)
+
+    def max(self):
+        return max(self._values) if self._values else None
+
+    def __len__(self):
+        return len(self._values)
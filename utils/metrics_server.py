@@ -0,0 +1,75 @@
+from aiohttp import web
+
+from utils.logger import Logger
+from utils.tracing import Tracer
+
+logger = Logger()
+tracer = Tracer()
+
+QUANTILES = (50, 90, 99)
+
+
+class MetricsServer:
+    """
+    Локальный HTTP сервер с эндпоинтами мониторинга:
+    /metrics - метрики в текстовом формате Prometheus, /healthz - состояние event loop
+    """
+
+    def __init__(self, loop_monitor, host, port):
+        self.loop_monitor = loop_monitor
+        self.host = host
+        self.port = port
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.router.add_get('/metrics', self._handle_metrics)
+        self.app.router.add_get('/healthz', self._handle_healthz)
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Metrics server started on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @staticmethod
+    def _summary(name, help_text, window):
+        """Формирует метрику типа summary по скользящему окну замеров (в секундах)"""
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+        for q in QUANTILES:
+            value = window.percentile(q)
+            lines.append(f'{name}{{quantile="{q / 100}"}} {value if value is not None else "NaN"}')
+        lines.append(f"{name}_sum {window.total}")
+        lines.append(f"{name}_count {window.count}")
+        return lines
+
+    async def _handle_metrics(self, request):
+        monitor = self.loop_monitor
+        lines = self._summary('bot_event_loop_lag_seconds', 'Event loop lag', monitor.lag)
+        lines += [
+            "# HELP bot_event_loop_lag_max_seconds Max event loop lag in the current window",
+            "# TYPE bot_event_loop_lag_max_seconds gauge",
+            f"bot_event_loop_lag_max_seconds {monitor.lag.max() or 0.0}",
+            "# HELP bot_event_loop_blocked_total Times the watchdog caught the loop blocked",
+            "# TYPE bot_event_loop_blocked_total counter",
+            f"bot_event_loop_blocked_total {monitor.blocked_count}",
+        ]
+        lines += self._summary('bot_handler_latency_seconds', 'Update handler latency', tracer.handler_latency)
+        return web.Response(text="\n".join(lines) + "\n", content_type='text/plain')
+
+    async def _handle_healthz(self, request):
+        monitor = self.loop_monitor
+        healthy = monitor.is_healthy()
+        return web.json_response(
+            {
+                'status': 'ok' if healthy else 'degraded',
+                'loop_lag_ms': round(monitor.last_lag * 1000, 1),
+                'loop_lag_p99_ms': round((monitor.lag.percentile(99) or 0.0) * 1000, 1),
+                'blocked_total': monitor.blocked_count,
+            },
+            status=200 if healthy else 503
+        )
@@ -0,0 +1,95 @@
+import os
+import time
+from contextlib import contextmanager
+
+from config.config import TEMP_DIR
+from utils.metrics import RollingWindow
+from utils.tracing import Tracer
+
+tracer = Tracer()
+
+# Сколько разных запросов отслеживать отдельно (запросы с подставленными id дают новые описания)
+MAX_STATEMENTS = 100
+OTHER_STATEMENTS = 'прочие запросы'
+
+
+class PerfCounters:
+    """
+    Singleton со счётчиками производительности внутри процесса:
+    время получения соединения из пула и время выполнения запросов DatabaseManager.
+    Счётчики только в памяти, для отчёта /perf в БД ходить не нужно
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PerfCounters, cls).__new__(cls)
+            cls._instance.connection_checkout = RollingWindow()
+            cls._instance.statements = {}
+        return cls._instance
+
+    def record_checkout(self, seconds):
+        self.connection_checkout.add(seconds)
+
+    def record_statement(self, description, seconds):
+        window = self.statements.get(description)
+        if window is None:
+            if len(self.statements) >= MAX_STATEMENTS:
+                description = OTHER_STATEMENTS
+                window = self.statements.get(description)
+            if window is None:
+                window = self.statements[description] = RollingWindow(size=200)
+        window.add(seconds)
+
+    @contextmanager
+    def measure_statement(self, description):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_statement(description, time.perf_counter() - started_at)
+
+    def format_report(self, loop_monitor, statements_limit=10):
+        """Форматирует отчёт о производительности для отправки админу"""
+        lines = ["Соединения с БД (получение из пула):", f"  {self._format_window(self.connection_checkout)}"]
+
+        lines.append(f"Запросы к БД (топ {statements_limit} по суммарному времени):")
+        statements = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)
+        if not statements:
+            lines.append("  запросов ещё не было")
+        for description, window in statements[:statements_limit]:
+            lines.append(f"  {description}")
+            lines.append(f"    {self._format_window(window)}, всего {window.total * 1000:.0f} мс")
+
+        lines.append("Обработчики апдейтов:")
+        lines.append(f"  {self._format_window(tracer.handler_latency)}")
+
+        lines.append("Лаг event loop:")
+        lines.append(f"  сейчас {loop_monitor.last_lag * 1000:.1f} мс, {self._format_window(loop_monitor.lag)}")
+        lines.append(f"  блокировок поймано: {loop_monitor.blocked_count}")
+
+        files, size = self._temp_dir_usage()
+        lines.append(f"Временная папка: {files} файлов, {size / 1024 / 1024:.1f} МБ")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_window(window):
+        if not len(window):
+            return "замеров нет"
+        return (f"n={window.count}, p50 {window.percentile(50) * 1000:.1f} мс, "
+                f"p99 {window.percentile(99) * 1000:.1f} мс, max {window.max() * 1000:.1f} мс")
+
+    @staticmethod
+    def _temp_dir_usage():
+        """Количество и суммарный размер файлов во временной папке"""
+        files = 0
+        size = 0
+        try:
+            with os.scandir(TEMP_DIR) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        files += 1
+                        size += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+        return files, size
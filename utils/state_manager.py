@@ -1,12 +1,26 @@
-from typing import Dict, Optional
+from typing import Optional
+
+from config.config import STATE_TTL, STATE_MAX_ENTRIES, STATE_DB_PATH
+from utils.state_store import StateStore, SQLiteStateBackend
+
+# Состояния авторизации сессии зависят от данных в памяти SessionController (клиент Telethon,
+# ожидающие Future), поэтому после перезапуска их не продолжить - на диск они не сохраняются
+SESSION_AUTH_STATES = frozenset({"AWAITING_CODE_INPUT_FOR_SESSION", "AWAITING_2FA_INPUT_FOR_SESSION"})
+
 
 class StateManager:
     def __init__(self):
-        # В простейшем варианте просто словарь в памяти
-        self._states: Dict[int, str] = {}
+        # Состояния истекают через STATE_TTL и при наличии STATE_DB_PATH сохраняются на диск
+        backend = SQLiteStateBackend(STATE_DB_PATH, 'dialog_states') if STATE_DB_PATH else None
+        self._states = StateStore(ttl=STATE_TTL, max_size=STATE_MAX_ENTRIES, backend=backend)
+
+        # Такие состояния могли остаться в файле от прошлых версий
+        for user_id, state in self._states.items():
+            if state in SESSION_AUTH_STATES:
+                self._states.pop(user_id)
 
     def set_state(self, user_id: int, state: str) -> None:
-        self._states[user_id] = state
+        self._states.set(user_id, state, persist=state not in SESSION_AUTH_STATES)
 
     def get_state(self, user_id: int) -> Optional[str]:
         return self._states.get(user_id)
@@ -15,4 +29,4 @@ class StateManager:
         self._states.pop(user_id, None)
 
     def has_state(self, user_id: int, state: str) -> bool:
-        return self._states.get(user_id) == state
\ No newline at end of file
+        return self._states.get(user_id) == state
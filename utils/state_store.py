@@ -0,0 +1,246 @@
+import asyncio
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from utils.logger import Logger
+
+logger = Logger()
+
+_MISSING = object()
+
+
+class SQLiteStateBackend:
+    """
+    Хранит записи StateStore в SQLite, чтобы незавершённые диалоги переживали перезапуск бота.
+    Запись идёт в отдельном потоке: set/pop только ставят операцию в очередь и не блокируют
+    event loop, а накопившиеся операции записываются одной транзакцией
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.namespace = namespace
+        # Соединение используется потоком записи, load() вызывается до его первой операции
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self.connection.commit()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name=f"state-writer-{namespace}", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def load(self):
+        """Возвращает неистёкшие записи в виде списка (key, value, expires_at)"""
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM state_entries WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time())
+            )
+        rows = self.connection.execute(
+            "SELECT key, value, expires_at FROM state_entries WHERE namespace = ? ORDER BY expires_at",
+            (self.namespace,)
+        ).fetchall()
+        return [(json.loads(key), json.loads(value), expires_at) for key, value, expires_at in rows]
+
+    def save(self, key: Hashable, value: Any, expires_at: float) -> None:
+        try:
+            serialized = json.dumps(value)
+        except (TypeError, ValueError):
+            logger.warning(f"State entry {key} is not JSON serializable and won't be persisted")
+            return
+        self._queue.put((
+            "INSERT OR REPLACE INTO state_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, json.dumps(key), serialized, expires_at)
+        ))
+
+    def delete(self, key: Hashable) -> None:
+        self._queue.put((
+            "DELETE FROM state_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, json.dumps(key))
+        ))
+
+    def flush(self) -> None:
+        """Ждёт, пока все поставленные в очередь операции будут записаны"""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Дописывает очередь и останавливает поток записи"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with self.connection:
+                    for operation in batch:
+                        if operation is not None:
+                            self.connection.execute(*operation)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing state entries to {self.namespace}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if None in batch:
+                return
+
+
+class StateStore:
+    """
+    Хранилище состояний диалогов с TTL на каждую запись и ограничением размера.
+    При переполнении вытесняются давно не использованные записи (LRU).
+    Незавершённые asyncio.Future в истёкших/вытесненных записях отменяются.
+    Истёкшие записи удаляются при обращении к ним, а фоновая задача start_sweeper()
+    периодически чистит все хранилища - так Future брошенного диалога отменяется,
+    даже если к хранилищу больше никто не обращается
+    """
+    SWEEP_INTERVAL = 60  # Как часто (в секундах) проверять все записи на истечение
+
+    _instances = weakref.WeakSet()
+    _sweeper_task = None
+
+    def __init__(self, ttl: float = 3600, max_size: int = 10000, backend: Optional[SQLiteStateBackend] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.backend = backend
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._next_sweep = time.time() + self.SWEEP_INTERVAL
+        StateStore._instances.add(self)
+
+        if self.backend is not None:
+            for key, value, expires_at in self.backend.load():
+                self._entries[key] = (value, expires_at)
+            logger.info(f"Restored {len(self._entries)} state entries from {self.backend.namespace}")
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, persist: bool = True) -> None:
+        """
+        Сохраняет значение и отсчитывает TTL заново.
+        persist=False - запись только в памяти (значение бесполезно после перезапуска)
+        """
+        now = time.time()
+        if now >= self._next_sweep:
+            self.purge_expired()
+
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous[0] is not value:
+            self._cancel_pending(previous[0])
+
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        self._entries[key] = (value, expires_at)
+        if self.backend is not None:
+            if persist:
+                self.backend.save(key, value, expires_at)
+            elif previous is not None:
+                self.backend.delete(key)
+
+        while len(self._entries) > self.max_size:
+            evicted_key, (evicted_value, _) = self._entries.popitem(last=False)
+            logger.warning(f"State store is full, evicting entry {evicted_key}")
+            self._discard(evicted_key, evicted_value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self._discard(key, value)
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Удаляет запись без отмены её Future - владелец сам завершает диалог"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        if self.backend is not None:
+            self.backend.delete(key)
+        return entry[0]
+
+    def items(self):
+        """Возвращает список (key, value) актуальных записей"""
+        self.purge_expired()
+        return [(key, value) for key, (value, _) in self._entries.items()]
+
+    def purge_expired(self) -> int:
+        """Удаляет все истёкшие записи и возвращает их количество"""
+        now = time.time()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            value, _ = self._entries.pop(key)
+            self._discard(key, value)
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        return len(expired)
+
+    @classmethod
+    def start_sweeper(cls) -> None:
+        """Запускает периодическую очистку всех хранилищ в текущем event loop"""
+        if cls._sweeper_task is None:
+            cls._sweeper_task = asyncio.create_task(cls._sweep_loop())
+
+    @classmethod
+    async def stop_sweeper(cls) -> None:
+        if cls._sweeper_task is not None:
+            cls._sweeper_task.cancel()
+            try:
+                await cls._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            cls._sweeper_task = None
+
+    @classmethod
+    async def _sweep_loop(cls):
+        while True:
+            await asyncio.sleep(cls.SWEEP_INTERVAL)
+            for store in list(cls._instances):
+                try:
+                    store.purge_expired()
+                except Exception as e:
+                    logger.error(f"Error purging expired state entries: {e}")
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: Hashable, value: Any) -> None:
+        self._cancel_pending(value)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    @staticmethod
+    def _cancel_pending(value: Any) -> None:
+        """Отменяет незавершённые Future в значении (само значение или словарь)"""
+        candidates = value.values() if isinstance(value, dict) else (value,)
+        for item in candidates:
+            if isinstance(item, asyncio.Future) and not item.done():
+                item.cancel()
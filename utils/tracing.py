@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from config.config import TRACE_SLOW_MS, TRACE_BUFFER_SIZE
+from utils.metrics import RollingWindow
+
+# Спан, внутри которого сейчас выполняется код (свой для каждой asyncio задачи)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+# Ограничение на количество дочерних спанов в одной трассе (проверка CSV делает тысячи запросов)
+MAX_SPANS_PER_TRACE = 200
+
+
+class Span:
+    __slots__ = ('name', 'root', 'started_at', 'duration', 'children', 'error', 'span_count', 'dropped')
+
+    def __init__(self, name, root=None):
+        self.name = name
+        self.root = root or self
+        self.started_at = time.perf_counter()
+        self.duration = None
+        self.children = []
+        self.error = None
+        self.span_count = 0
+        self.dropped = 0
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started_at
+
+    def render(self, depth=0):
+        """Возвращает строки с деревом спанов и их длительностью в мс"""
+        duration = f"{self.duration * 1000:.1f}ms" if self.duration is not None else "running"
+        error = f" !{self.error}" if self.error else ""
+        lines = [f"{'  ' * depth}{self.name}: {duration}{error}"]
+        for child in self.children:
+            lines.extend(child.render(depth + 1))
+        if self.dropped:
+            lines.append(f"{'  ' * (depth + 1)}... ещё {self.dropped} спанов не записано")
+        return lines
+
+
+class Tracer:
+    """
+    Singleton-трассировщик обработки апдейтов.
+    На каждый апдейт создаётся корневой спан, запросы к БД, этапы работы с CSV и вызовы
+    TelegramView записываются в него дочерними спанами. Медленные трассы попадают в кольцевой буфер.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Tracer, cls).__new__(cls)
+            cls._instance._slow_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+            cls._instance.handler_latency = RollingWindow()
+        return cls._instance
+
+    @contextmanager
+    def span(self, name):
+        """Записывает дочерний спан текущей трассы. Вне обработки апдейта ничего не делает"""
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+
+        root = parent.root
+        if root.span_count >= MAX_SPANS_PER_TRACE:
+            root.dropped += 1
+            yield None
+            return
+
+        span = Span(name, root)
+        root.span_count += 1
+        parent.children.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(token)
+
+    def traced(self, name):
+        """Декоратор, записывающий вызов функции (обычной или async) дочерним спаном"""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+    def trace_handler(self, handler):
+        """Оборачивает обработчик апдейта, создавая корневой спан трассы"""
+        handler_name = getattr(handler, '__qualname__', repr(handler))
+
+        @wraps(handler)
+        async def wrapper(update, context):
+            root = Span(f"update {update.update_id} {handler_name} [{self._describe_update(update)}]")
+            token = _current_span.set(root)
+            try:
+                return await handler(update, context)
+            except Exception as e:
+                root.error = type(e).__name__
+                raise
+            finally:
+                root.finish()
+                _current_span.reset(token)
+                self.handler_latency.add(root.duration)
+                if root.duration * 1000 >= TRACE_SLOW_MS:
+                    self._slow_traces.append(root)
+
+        return wrapper
+
+    def slow_traces(self):
+        """Возвращает медленные трассы, начиная с самой свежей"""
+        return list(reversed(self._slow_traces))
+
+    def format_slow_traces(self, limit=5):
+        """Форматирует последние медленные трассы для отправки админу"""
+        traces = self.slow_traces()[:limit]
+        if not traces:
+            return f"Медленных апдейтов (>{TRACE_SLOW_MS} мс) не было"
+        return "\n\n".join("\n".join(trace.render()) for trace in traces)
+
+    @staticmethod
+    def _describe_update(update):
+        if update.callback_query:
+            return f"callback {update.callback_query.data}"
+        if update.message:
+            if update.message.document:
+                return "document"
+            if update.message.text:
+                # Сам текст может содержать коды и пароли, поэтому пишем только команды
+                text = update.message.text
+                return text.split()[0] if text.startswith('/') else "text"
+        return "other"
+
+
+def trace_methods(prefix):
+    """Декоратор класса: записывает спаном каждый публичный async метод"""
+    def decorator(cls):
+        tracer = Tracer()
+        for name, attr in list(vars(cls).items()):
+            if not name.startswith('_') and asyncio.iscoroutinefunction(attr):
+                setattr(cls, name, tracer.traced(f"{prefix}.{name}")(attr))
+        return cls
+
+    return decorator
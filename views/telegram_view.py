@@ -1,7 +1,26 @@
+import html
+import os
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
+from utils.tracing import trace_methods
+
 
+def escape_truncated(text: str, limit: int) -> str:
+    """
+    Экранирует текст для HTML и укорачивает так, чтобы результат был не длиннее limit.
+    Обрезается исходный текст, а не экранированный, иначе можно разрезать сущность вроде &lt;
+    """
+    escaped = html.escape(text)
+    while len(escaped) > limit:
+        # Сокращаем пропорционально: длина строго убывает, но лишнего не отрезаем
+        text = text[:len(text) * limit // len(escaped)]
+        escaped = html.escape(text)
+    return escaped
+
+
+@trace_methods('view')
 class TelegramView:
     """
     Класс для отображения сообщений в Telegram.
@@ -22,7 +41,8 @@ class TelegramView:
                 InlineKeyboardButton("🌐 Управление прокси", callback_data="proxy_menu")
             ])
             keyboard.append([
-                InlineKeyboardButton("📊 Статус всей хуйни", callback_data="status")
+                InlineKeyboardButton("📊 Статус всей хуйни", callback_data="status"),
+                InlineKeyboardButton("⏱ Производительность", callback_data="perf")
             ])
 
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -337,18 +357,27 @@ class TelegramView:
             )
         context.user_data["last_menu_message_id"] = sent.message_id
 
-    async def show_final_file(self, update: Update, context: ContextTypes.DEFAULT_TYPE, file):
+    async def show_final_file(self, update: Update, context: ContextTypes.DEFAULT_TYPE, files):
+        """Отправляет файл с результатами (или его части), файлы читаются с диска потоком"""
         keyboard = [[InlineKeyboardButton("⬅️ Назад в главное меню", callback_data="main_menu")]]
 
         reply_markup = InlineKeyboardMarkup(keyboard)
 
-        sent = await context.bot.send_document(
-            chat_id=update.effective_chat.id,
-            document=file,
-            caption=f"✅ *Файл CSV успешно создан!*\n\n",
-            reply_markup=reply_markup,
-            parse_mode="Markdown"
-        )
+        for index, file in enumerate(files, start=1):
+            caption = f"✅ *Файл CSV успешно создан!*\n\n"
+            if len(files) > 1:
+                caption += f"Часть {index} из {len(files)}"
+
+            with open(file, 'rb') as document:
+                sent = await context.bot.send_document(
+                    chat_id=update.effective_chat.id,
+                    document=document,
+                    filename=os.path.basename(file),
+                    caption=caption,
+                    # Кнопка меню только под последней частью
+                    reply_markup=reply_markup if index == len(files) else None,
+                    parse_mode="Markdown"
+                )
 
     async def show_custom_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text):
         """Отправляет кастомное сообщение"""
@@ -362,4 +391,39 @@ class TelegramView:
             reply_markup=reply_markup,
             parse_mode="Markdown"
         )
-        context.user_data["last_menu_message_id"] = sent.message_id
\ No newline at end of file
+        context.user_data["last_menu_message_id"] = sent.message_id
+
+    async def show_rejected_message(self, update: Update, reason: str):
+        """Быстрый отказ, когда запрос не прошёл контроль нагрузки"""
+        text = f"⏳ {reason}"
+        if update.callback_query:
+            try:
+                await update.callback_query.answer(text, show_alert=True)
+                return
+            except Exception:
+                # На callback уже ответили - сообщаем обычным сообщением
+                pass
+        await update.effective_chat.send_message(text)
+
+    async def show_perf_report(self, update: Update, text: str):
+        """Отправляет админу отчёт о производительности"""
+        keyboard = [[InlineKeyboardButton("⬅️ Назад в главное меню", callback_data="main_menu")]]
+
+        reply_markup = InlineKeyboardMarkup(keyboard)
+
+        # Лимит длины сообщения Telegram - 4096 символов
+        text = escape_truncated(text, 3900)
+        await update.effective_chat.send_message(
+            f"⏱ <b>Производительность:</b>\n<pre>{text}</pre>",
+            reply_markup=reply_markup,
+            parse_mode="HTML"
+        )
+
+    async def show_traces(self, update: Update, text: str):
+        """Отправляет админу дамп медленных трасс"""
+        # Лимит длины сообщения Telegram - 4096 символов
+        text = escape_truncated(text, 3900)
+        await update.effective_chat.send_message(
+            f"🐢 <b>Медленные апдейты:</b>\n<pre>{text}</pre>",
+            parse_mode="HTML"
+        )